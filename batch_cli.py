@@ -0,0 +1,296 @@
+#headless batch evaluation, streams integration pairs from CSV/JSONL through
+#the scoring engine without touching tkinter, ttkbootstrap or matplotlib.
+#
+#JSONL input, one pair per line:
+#  {"integration_pair": "ERP A/B", "strategies": ["Symbiosis", "Absorption"],
+#   "weights": ["High", "Low", "Low", "Low", "Low", "High"],
+#   "scores": [[7, 5, 6, 3, 4, 5], [6, 8, 7, 5, 5, 4]]}
+#"weights" may also be a {criterion: category} dict or numbers, "directions" is optional.
+#
+#CSV input, one row per strategy, rows of a pair must be consecutive:
+#  integration_pair,strategy,<criterion 1>,...,<criterion n>
+#a row whose strategy is __weights__ (or __directions__) sets the weight
+#categories (or directions) for its pair, otherwise --weights is used.
+#
+#--output-format npy or parquet appends the results to a columnar store in the
+#--output folder instead (see results_export.py).
+#
+#--methods saw,topsis,vikor adds the scores and ranks of those MCDA methods
+#(see mcda.py) next to the default weighted sum. --stability adds, for every
+#criterion, the weight interval in which each strategy keeps its rank and the
+#weights at which two strategies swap places (see stability.py).
+#
+#--pareto drops the strategies dominated on every criterion before they are
+#scored, the output lists them under "pruned" with the strategy dominating
+#them (see calculations.pareto_front).
+import argparse
+import csv
+import json
+import sys
+from itertools import groupby, islice
+
+import numpy as np
+
+from calculations import evaluate_batch, evaluate_batch_pareto
+from criteria import CATEGORY_TO_WEIGHT, DEFAULT_CRITERIA, DEFAULT_DIRECTIONS
+from mcda import METHODS, evaluate_methods
+from stability import stability_batch
+from results_export import STORES, ResultExporter
+
+WEIGHTS_ROW = "__weights__"
+DIRECTIONS_ROW = "__directions__"
+DEFAULT_BATCH_SIZE = 1024
+
+#turns weight categories (or plain numbers) into weights summing to 1.0,
+#the same way the GUI does in process_input
+def resolve_weights(weights, criteria=DEFAULT_CRITERIA):
+    if isinstance(weights, dict):
+        weights = [weights[criterion] for criterion in criteria]
+    resolved = []
+    for w in weights:
+        if isinstance(w, str) and w not in CATEGORY_TO_WEIGHT:
+            try:
+                w = float(w)
+            except ValueError:
+                raise ValueError(f"Invalid weight category '{w}'.") from None
+        resolved.append(CATEGORY_TO_WEIGHT[w] if isinstance(w, str) else float(w))
+    total_weight = sum(resolved)
+    if not total_weight > 0:
+        raise ValueError("Weights must add up to more than 0.")
+    if abs(total_weight - 1.0) > 0.01:
+        resolved = [w / total_weight for w in resolved]
+    return resolved
+
+def _pair(name, strategies, weights, scores, directions=None):
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim != 2 or scores.shape[0] != len(strategies):
+        raise ValueError(f"Score matrix for '{name}' must have one row per strategy.")
+    weights = resolve_weights(weights)
+    directions = list(directions) if directions else list(DEFAULT_DIRECTIONS)
+    if not (len(weights) == len(directions) == scores.shape[1]):
+        raise ValueError(f"Weights, directions and scores for '{name}' have different criteria counts.")
+    return {"integration_pair": name, "strategies": list(strategies), "weights": weights,
+            "scores": scores, "directions": directions}
+
+def _criteria_names(n_criteria):
+    if n_criteria == len(DEFAULT_CRITERIA):
+        return list(DEFAULT_CRITERIA)
+    return [f"criterion_{j + 1}" for j in range(n_criteria)]
+
+#per criterion stability of pair k of a stability_batch result
+def _stability_record(stability, k, strategies):
+    crossovers = stability["crossovers"][k]
+    record = {}
+    for j, criterion in enumerate(_criteria_names(crossovers.shape[0])):
+        points = crossovers[j]
+        record[criterion] = {
+            "weight": float(stability["weights"][k, j]),
+            "winner_interval": [float(stability["winner_lower"][k, j]), float(stability["winner_upper"][k, j])],
+            "ranking_interval": [float(stability["ranking_lower"][k, j]), float(stability["ranking_upper"][k, j])],
+            "strategy_intervals": {s: [float(stability["lower"][k, j, i]), float(stability["upper"][k, j, i])]
+                                   for i, s in enumerate(strategies)},
+            "crossovers": sorted([float(points[a, b]), strategies[a], strategies[b]]
+                                 for a in range(len(strategies)) for b in range(a + 1, len(strategies))
+                                 if not np.isnan(points[a, b])),
+        }
+    return record
+
+#one JSON pair definition as described above, as the pair dict evaluate_stream takes
+def pair_from_json(rec, default_name):
+    if not isinstance(rec, dict):
+        raise ValueError(f"Expected a JSON object, got {type(rec).__name__}.")
+    return _pair(rec.get("integration_pair", default_name), rec["strategies"], rec["weights"],
+                 rec["scores"], rec.get("directions"))
+
+def read_jsonl(stream):
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            pair = pair_from_json(json.loads(line), f"pair_{line_no}")
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Skipping line {line_no}: {e}", file=sys.stderr)
+            continue
+        yield pair
+
+def read_csv(stream, default_weights):
+    #blank lines, also between the rows of a pair, are ignored
+    reader = (row for row in csv.reader(stream) if any(cell.strip() for cell in row))
+    header = next(reader, None)
+    if header is None:
+        return
+    for name, rows in groupby(reader, key=lambda row: row[0]):
+        strategies, scores = [], []
+        weights, directions = default_weights, None
+        try:
+            for row in rows:
+                if row[1] == WEIGHTS_ROW:
+                    weights = row[2:]
+                elif row[1] == DIRECTIONS_ROW:
+                    directions = row[2:]
+                else:
+                    strategies.append(row[1])
+                    scores.append([float(v) if v else 0.0 for v in row[2:]])
+            pair = _pair(name, strategies, weights, scores, directions)
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Skipping pair '{name}': {e}", file=sys.stderr)
+            continue
+        yield pair
+
+#consecutive pairs with the same matrix shape are scored together on the
+#vectorized path, results are identical to calling evaluate_integration per pair.
+#methods adds the results of those MCDA methods, all computed in one pass per group,
+#stability the weight stability intervals. pareto scores only the strategies on
+#the Pareto front and adds the dominated ones as {strategy: dominating strategy}
+def evaluate_stream(pairs, batch_size=DEFAULT_BATCH_SIZE, methods=(), stability=False, pareto=False):
+    pairs = iter(pairs)
+    while True:
+        chunk = list(islice(pairs, batch_size))
+        if not chunk:
+            return
+        for _, group in groupby(chunk, key=lambda p: p["scores"].shape):
+            group = list(group)
+            scores = np.stack([p["scores"] for p in group])
+            weights = np.array([p["weights"] for p in group])
+            directions = np.array([p["directions"] for p in group])
+            if pareto:
+                final_scores, winners, dominated_by = evaluate_batch_pareto(scores, weights, directions)
+            else:
+                final_scores, winners = evaluate_batch(scores, weights, directions)
+            method_results = evaluate_methods(scores, weights, directions, methods) if methods else {}
+            stability_results = stability_batch(scores, weights, directions) if stability else None
+            for k, (pair, row, winner) in enumerate(zip(group, final_scores, winners)):
+                strategies = pair["strategies"]
+                if pareto:
+                    front = dominated_by[k] < 0
+                    results = {s: float(score) for s, score, keep in zip(strategies, row, front) if keep}
+                else:
+                    results = {s: float(score) for s, score in zip(strategies, row)}
+                best_strategy = strategies[winner]
+                result = {"integration_pair": pair["integration_pair"], "scores": results,
+                          "best_strategy": best_strategy, "best_score": results[best_strategy]}
+                if pareto:
+                    result["pruned"] = {strategies[i]: strategies[d] for i, d in enumerate(dominated_by[k]) if d >= 0}
+                if methods:
+                    result["methods"] = {
+                        name: {"scores": {s: float(v) for s, v in zip(strategies, m["scores"][k])},
+                               "ranks": {s: int(r) for s, r in zip(strategies, m["ranks"][k])},
+                               "best_strategy": strategies[m["winners"][k]]}
+                        for name, m in method_results.items()
+                    }
+                if stability:
+                    result["stability"] = _stability_record(stability_results, k, strategies)
+                yield result
+
+def write_jsonl(results, stream):
+    for result in results:
+        stream.write(json.dumps(result) + "\n")
+
+#with stability every row gets the weight interval per criterion in which
+#that strategy keeps its rank. with pareto the dominated strategies get a row
+#without a score that names the strategy dominating them
+def write_csv(results, stream, methods=(), stability=False, pareto=False):
+    writer = csv.writer(stream)
+    header = ["Integration pair", "Strategy", "Score", "Best"]
+    if pareto:
+        header.append("Dominated by")
+    for name in methods:
+        header += [f"{name.upper()} score", f"{name.upper()} rank"]
+    #the stability columns depend on the criteria of the first pair
+    header_written = False
+    for result in results:
+        if not header_written:
+            if stability:
+                for criterion in result["stability"]:
+                    header += [f"{criterion} stable from", f"{criterion} stable to"]
+            writer.writerow(header)
+            header_written = True
+        for strategy, score in result["scores"].items():
+            row = [result["integration_pair"], strategy, score, int(strategy == result["best_strategy"])]
+            if pareto:
+                row.append("")
+            for name in methods:
+                method = result["methods"][name]
+                row += [method["scores"][strategy], method["ranks"][strategy]]
+            if stability:
+                for entry in result["stability"].values():
+                    row += entry["strategy_intervals"][strategy]
+            writer.writerow(row)
+        if pareto:
+            writer.writerows([result["integration_pair"], strategy, "", 0, dominating]
+                             for strategy, dominating in result["pruned"].items())
+    if not header_written:
+        writer.writerow(header)
+
+#appends the results to a columnar store in folder, batch_size pairs per write
+def write_store(results, folder, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    with ResultExporter(folder, fmt) as exporter:
+        while True:
+            chunk = list(islice(results, batch_size))
+            if not chunk:
+                return
+            exporter.append_many(chunk)
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate integration pairs without the GUI.")
+    parser.add_argument("input", nargs="?", default="-", help="CSV/JSONL file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, '-' for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"] + [f for f in STORES if f != "csv"],
+                        help="npy and parquet write a columnar store into the --output folder")
+    parser.add_argument("--weights", default=",".join(["Medium"] * len(DEFAULT_CRITERIA)),
+                        help="comma separated weight categories used for CSV pairs without a __weights__ row")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--methods", default="",
+                        help=f"comma separated MCDA methods to add to the output ({', '.join(METHODS)})")
+    parser.add_argument("--stability", action="store_true",
+                        help="add the weight intervals in which the rankings stay the same")
+    parser.add_argument("--pareto", action="store_true",
+                        help="only score the strategies that are not dominated on every criterion")
+    args = parser.parse_args(argv)
+    methods = [m.strip().lower() for m in args.methods.split(",") if m.strip()]
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        parser.error(f"unknown method(s): {', '.join(unknown)}")
+    #the methods and the stability intervals rank all strategies of a pair
+    if args.pareto and (methods or args.stability):
+        parser.error("--pareto cannot be combined with --methods or --stability")
+
+    in_path = None if args.input == "-" else args.input
+    out_path = None if args.output == "-" else args.output
+    input_format = _detect_format(in_path, args.input_format)
+    output_format = _detect_format(out_path, args.output_format)
+    to_store = output_format not in ("csv", "jsonl")
+    if to_store and not out_path:
+        parser.error(f"--output-format {output_format} needs an --output folder")
+
+    source = open(in_path, newline="", encoding="utf-8") if in_path else sys.stdin
+    sink = open(out_path, "w", newline="", encoding="utf-8") if out_path and not to_store else sys.stdout
+    try:
+        if input_format == "csv":
+            pairs = read_csv(source, args.weights.split(","))
+        else:
+            pairs = read_jsonl(source)
+        results = evaluate_stream(pairs, args.batch_size, methods, args.stability, args.pareto)
+        if to_store:
+            write_store(results, out_path, output_format, args.batch_size)
+        elif output_format == "csv":
+            write_csv(results, sink, methods, args.stability, args.pareto)
+        else:
+            write_jsonl(results, sink)
+    finally:
+        if in_path:
+            source.close()
+        if out_path and not to_store:
+            sink.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
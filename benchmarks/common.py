@@ -0,0 +1,91 @@
+#shared helpers for the benchmark scripts: timing, JSON baselines and the
+#regression check
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_THRESHOLD = 0.25
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+#median wall time of one call in seconds, setup runs before every repeat and
+#is not timed. warmup calls (e.g. to pay for lazy imports) are not timed either
+def timeit(fn, repeat=5, setup=None, warmup=0):
+    for _ in range(warmup):
+        fn(setup()) if setup else fn()
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def environment():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return info
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=4)
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    #older baselines were a flat {metric: seconds} mapping
+    return data.get("results", data)
+
+#metrics that got slower than baseline * (1 + threshold), None means the
+#metric could not be measured in this run or the baseline
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = {}
+    for name, value in results.items():
+        base = baseline.get(name)
+        if value is None or base is None:
+            continue
+        if value > base * (1 + threshold):
+            regressions[name] = (base, value)
+    return regressions
+
+def print_results(results):
+    for name, value in results.items():
+        print(f"{name:48s} {'n/a' if value is None else f'{value * 1000:12.3f} ms'}")
+
+def print_regressions(regressions):
+    for name, (base, value) in regressions.items():
+        print(f"REGRESSION {name}: {base * 1000:.3f} ms -> {value * 1000:.3f} ms "
+              f"({(value / base - 1) * 100:+.0f}%)")
+
+def add_baseline_arguments(parser, default_baseline):
+    parser.add_argument("--baseline", default=default_baseline)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit with 1 if a metric regressed")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown relative to the baseline (0.25 = 25%%)")
+
+#common tail of the benchmark scripts, returns the exit code
+def report(results, args):
+    print_results(results)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}, run with --save-baseline first.")
+            return 1
+        regressions = find_regressions(results, load_baseline(args.baseline), args.threshold)
+        print_regressions(regressions)
+        return 1 if regressions else 0
+    return 0
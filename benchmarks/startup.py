@@ -0,0 +1,91 @@
+#startup benchmark: import cost per module and time-to-first-frame of the GUI.
+#every measurement runs in a fresh interpreter so module caches do not hide
+#import costs.
+#
+#  python benchmarks/startup.py                   print the measurements
+#  python benchmarks/startup.py --save-baseline   store them as the baseline
+#  python benchmarks/startup.py --check           fail on regressions against the baseline
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from common import REPO_ROOT, add_baseline_arguments, report
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "startup_baseline.json")
+
+MODULES = ["gui", "calculations", "mcda", "stability", "results_export", "sensitivity", "batch_cli", "session_store",
+           "score_grid", "results_chart", "ttkbootstrap", "numpy", "pandas"]
+
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import ttkbootstrap as ttk
+from gui import IntegrationGUI
+root = ttk.Window(themename="darkly")
+app = IntegrationGUI(root, warm_up=False)
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+def _run(args):
+    return subprocess.run([sys.executable] + args, cwd=REPO_ROOT, capture_output=True, text=True)
+
+#cumulative import time of a module (including everything it imports) in seconds
+def import_cost(module):
+    proc = _run(["-X", "importtime", "-c", f"import {module}"])
+    if proc.returncode != 0:
+        return None
+    for line in reversed(proc.stderr.splitlines()):
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if name == module and cumulative.isdigit():
+            return int(cumulative) / 1e6
+    return None
+
+#seconds from the first import to the first drawn frame of the welcome screen,
+#None when no display is available
+def time_to_first_frame():
+    proc = _run(["-c", FIRST_FRAME_SCRIPT])
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+#heavy modules that importing the GUI pulls in, should stay empty
+def eagerly_loaded(modules=("numpy", "pandas", "matplotlib")):
+    check = f"import sys, gui; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    proc = _run(["-c", check])
+    if proc.returncode != 0:
+        return None
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+def _median(samples):
+    samples = [s for s in samples if s is not None]
+    return statistics.median(samples) if samples else None
+
+def measure(repeat=5):
+    results = {"time_to_first_frame": _median(time_to_first_frame() for _ in range(repeat))}
+    for module in MODULES:
+        results[f"import:{module}"] = _median(import_cost(module) for _ in range(repeat))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure GUI startup and import costs.")
+    parser.add_argument("--repeat", type=int, default=5)
+    add_baseline_arguments(parser, DEFAULT_BASELINE)
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+    loaded = eagerly_loaded()
+    if loaded:
+        print(f"importing gui loads {', '.join(loaded)}, these should be deferred")
+        if args.check:
+            report(results, args)
+            return 1
+    return report(results, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#benchmark suite for the scoring pipeline, persistence and GUI screen builds.
+#
+#  python benchmarks/suite.py                   run everything and print the timings
+#  python benchmarks/suite.py --quick           skip the largest matrices and histories
+#  python benchmarks/suite.py --only scoring    run one group (scoring, persistence, gui)
+#  python benchmarks/suite.py --save-baseline   store the timings as the JSON baseline
+#  python benchmarks/suite.py --check           fail when a timing regressed past --threshold
+#
+#GUI benchmarks need a display. Without one an Xvfb virtual display is started
+#when the Xvfb binary is available, otherwise they are reported as n/a.
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from common import REPO_ROOT, add_baseline_arguments, report, timeit
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+#(strategies, criteria)
+MATRIX_SIZES = [(4, 6), (100, 6), (1_000, 20), (10_000, 50), (100_000, 50), (1_000_000, 50)]
+QUICK_MATRIX_SIZES = MATRIX_SIZES[:-1]
+#matrices at least this large are also timed memory-mapped on the out-of-core path
+OUT_OF_CORE_MIN_SIZE = 1_000_000
+#pairs of 4 strategies x 6 criteria scored together on the batched path
+BATCH_PAIRS = [1_000, 100_000]
+QUICK_BATCH_PAIRS = BATCH_PAIRS[:-1]
+#candidate variants of one pair (x 6 criteria) for the Pareto pre-filter,
+#spread around one base strategy so most of them are dominated
+PARETO_CANDIDATES = [10_000, 100_000]
+QUICK_PARETO_CANDIDATES = PARETO_CANDIDATES[:-1]
+HISTORY_SIZES = [0, 1_000, 10_000, 100_000]
+QUICK_HISTORY_SIZES = HISTORY_SIZES[:-1]
+#appends timed at every history size
+APPENDS_PER_SAMPLE = 100
+#records per append_many call while a result store is grown to the next history size
+EXPORT_GROW_BATCH = 1_000
+
+def bench_scoring(sizes, batch_pairs, pareto_candidates, repeat):
+    import numpy as np
+    from calculations import calculate_final_scores, evaluate_batch, evaluate_batch_pareto, evaluate_out_of_core, \
+        normalize_data, pareto_front
+    from stability import stability_batch
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for n_strategies, n_criteria in sizes:
+        scores = rng.uniform(0, 10, size=(n_strategies, n_criteria))
+        weights = rng.dirichlet(np.ones(n_criteria))
+        directions = (["max", "min"] * n_criteria)[:n_criteria]
+        label = f"{n_strategies}x{n_criteria}"
+        #large matrices are slow enough that fewer repeats give a stable median
+        reps = repeat if scores.size < 10_000_000 else max(1, repeat // 2)
+
+        results[f"scoring:normalize:{label}"] = timeit(lambda: normalize_data(scores, directions), reps)
+        normalized = normalize_data(scores, directions)
+        results[f"scoring:final_scores:{label}"] = timeit(lambda: calculate_final_scores(normalized, weights), reps)
+        del normalized
+
+        if scores.size >= OUT_OF_CORE_MIN_SIZE:
+            workdir = tempfile.mkdtemp(prefix="bench_")
+            try:
+                path = os.path.join(workdir, "scores.npy")
+                np.save(path, scores.astype(np.float32))
+                mapped = np.load(path, mmap_mode="r")
+                results[f"scoring:evaluate_out_of_core:{label}"] = timeit(
+                    lambda: evaluate_out_of_core(mapped, weights, directions), reps)
+                del mapped
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    for n_pairs in batch_pairs:
+        scores = rng.uniform(0, 10, size=(n_pairs, 4, 6))
+        weights = rng.dirichlet(np.ones(6), size=n_pairs)
+        results[f"scoring:evaluate_batch:{n_pairs}x4x6"] = timeit(
+            lambda: evaluate_batch(scores, weights, ["max", "max", "max", "min", "min", "min"]), repeat)
+        results[f"scoring:stability_batch:{n_pairs}x4x6"] = timeit(
+            lambda: stability_batch(scores, weights, ["max", "max", "max", "min", "min", "min"]), repeat)
+        results[f"scoring:evaluate_batch_pareto:{n_pairs}x4x6"] = timeit(
+            lambda: evaluate_batch_pareto(scores, weights, ["max", "max", "max", "min", "min", "min"]), repeat)
+
+    directions = ["max", "max", "max", "min", "min", "min"]
+    for n_candidates in pareto_candidates:
+        quality = rng.normal(size=(n_candidates, 1)) * np.array([1, 1, 1, -1, -1, -1])
+        scores = rng.uniform(3, 7, size=6) + quality + rng.normal(size=(n_candidates, 6))
+        results[f"scoring:pareto_front:{n_candidates}x6"] = timeit(lambda: pareto_front(scores, directions), repeat)
+    return results
+
+def _record(i, pair):
+    return {
+        "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "integration_pair": pair,
+        "strategies": ["Symbiosis", "Absorption", "Preservation", "Transformation"],
+        "weights": [0.2, 0.1, 0.2, 0.2, 0.1, 0.2],
+        "scores": {"Symbiosis": 0.5, "Absorption": 0.25 + i % 7 / 10, "Preservation": 0.1, "Transformation": 0.4},
+    }
+
+def bench_persistence(history_sizes, repeat):
+    from session_store import SessionStore
+    from results_export import ResultExporter, available_formats
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        store = SessionStore(os.path.join(workdir, "sessions.db"))
+        #one evaluation appended to the consolidated result store, as the GUI does
+        exporters = {fmt: ResultExporter(os.path.join(workdir, f"export_{fmt}"), fmt) for fmt in available_formats()}
+        written = exported = 0
+        for size in history_sizes:
+            #grow the history to the next size, then time a batch of appends
+            for i in range(written, size):
+                store.append(_record(i, f"pair_{i % 50}"))
+            written = max(written, size)
+            for start in range(exported, size, EXPORT_GROW_BATCH):
+                records = [_record(i, f"pair_{i % 50}") for i in range(start, min(start + EXPORT_GROW_BATCH, size))]
+                for exporter in exporters.values():
+                    exporter.append_many(records)
+            exported = max(exported, size)
+
+            def appends():
+                for i in range(APPENDS_PER_SAMPLE):
+                    store.append(_record(i, "bench_pair"))
+            per_append = timeit(appends, repeat) / APPENDS_PER_SAMPLE
+            written += repeat * APPENDS_PER_SAMPLE
+            results[f"persistence:session_append:history={size}"] = per_append
+            results[f"persistence:latest_10:history={size}"] = timeit(lambda: store.latest("pair_1", 10), repeat)
+
+            for fmt, exporter in exporters.items():
+                def exports():
+                    for i in range(APPENDS_PER_SAMPLE):
+                        exporter.append_many([_record(i, "bench_pair")])
+                results[f"persistence:results_export:{fmt}:history={size}"] = (
+                    timeit(exports, repeat, warmup=1) / APPENDS_PER_SAMPLE)
+                exported += (repeat + 1) * APPENDS_PER_SAMPLE
+        store.close()
+        for exporter in exporters.values():
+            exporter.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+#starts Xvfb when there is no display, returns the process to stop afterwards
+def _ensure_display():
+    if os.environ.get("DISPLAY") or sys.platform.startswith("win") or sys.platform == "darwin":
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None
+    display = ":97"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return proc
+
+def bench_gui(repeat):
+    names = ["gui:create_initial_gui", "gui:create_input_screen", "gui:get_strategy_scores", "gui:navigate_round_trip"]
+    xvfb = _ensure_display()
+    try:
+        import ttkbootstrap as ttk
+        from gui import IntegrationGUI
+        try:
+            root = ttk.Window(themename="darkly")
+        except Exception as e:
+            print(f"GUI benchmarks skipped, no display available ({e})")
+            return {name: None for name in names}
+
+        app = IntegrationGUI(root, warm_up=False)
+        #load the deferred modules up front so the screen timings do not include imports
+        from gui import warm_up_imports
+        warm_up_imports()
+
+        def build(screen):
+            screen()
+            root.update()
+
+        #state normally collected by get_strategy_count and process_input
+        app.selected_strategy_types = ["Symbiosis", "Absorption", "Preservation", "Transformation"]
+        app.strategies = app.selected_strategy_types
+        app.weights = [0.2, 0.1, 0.2, 0.2, 0.1, 0.2]
+        app.integration_pair_name = "bench_pair"
+
+        results = {
+            "gui:create_initial_gui": timeit(lambda: build(app.create_initial_gui), repeat),
+            "gui:create_input_screen": timeit(lambda: build(app.create_input_screen), repeat),
+            "gui:get_strategy_scores": timeit(lambda: build(app.get_strategy_scores), repeat),
+            #back to the weights and forward to the scores again, both screens are cached
+            "gui:navigate_round_trip": timeit(lambda: (build(app.back_to_input), build(app.get_strategy_scores)),
+                                              repeat),
+        }
+        root.destroy()
+        return results
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline, persistence and GUI screens.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip the largest matrices and histories")
+    parser.add_argument("--only", choices=["scoring", "persistence", "gui"], action="append")
+    add_baseline_arguments(parser, DEFAULT_BASELINE)
+    args = parser.parse_args(argv)
+
+    groups = args.only or ["scoring", "persistence", "gui"]
+    results = {}
+    if "scoring" in groups:
+        results.update(bench_scoring(QUICK_MATRIX_SIZES if args.quick else MATRIX_SIZES,
+                                     QUICK_BATCH_PAIRS if args.quick else BATCH_PAIRS,
+                                     QUICK_PARETO_CANDIDATES if args.quick else PARETO_CANDIDATES, args.repeat))
+    if "persistence" in groups:
+        results.update(bench_persistence(QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES, args.repeat))
+    if "gui" in groups:
+        results.update(bench_gui(args.repeat))
+    return report(results, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,305 @@
-import numpy as np
-import pandas as pd
-
-#normalization function
-def normalize_data(scores, directions):
-    min_vals = np.min(scores, axis=0)
-    max_vals = np.max(scores, axis=0)
-    range_vals = max_vals - min_vals
-    range_vals[range_vals == 0] = 1  #avoid division by zero
-
-    normalized_scores = np.zeros_like(scores, dtype=float)
-
-    for i, direction in enumerate(directions):
-        if direction == 'max':
-            normalized_scores[:, i] = (scores[:, i] - min_vals[i]) / range_vals[i]
-        elif direction == 'min':
-            normalized_scores[:, i] = (max_vals[i] - scores[:, i]) / range_vals[i]
-        else:
-            normalized_scores[:, i] = 0.5 #if the values of the criteria are the same set 0.5
-
-    return normalized_scores
-
-#final score calculation
-def calculate_final_scores(normalized_scores, weights):
-    return np.dot(normalized_scores, weights)
-
-#evaluation function
-def evaluate_integration(strategies, weights, scores, directions):
-    normalized_scores = normalize_data(scores, directions)
-    final_scores = calculate_final_scores(normalized_scores, weights)
-    return {strategies[i]: final_scores[i] for i in range(len(strategies))}
-
-def save_results_to_csv(results, filename='results.csv'):
-    df = pd.DataFrame(list(results.items()), columns=['Strategy', 'Final Score'])
-    df.to_csv(filename, index=False)
+import tempfile
+import numpy as np
+
+#direction codes used by the vectorized paths
+DIRECTION_CODES = {'max': 1, 'min': -1}
+
+#memory-mapped score matrices (np.memmap, np.load(..., mmap_mode='r')) are
+#processed out of core in chunks of about this many bytes (as float64). peak
+#memory is a small multiple of it and does not grow with the size of the file
+OUT_OF_CORE_CHUNK_BYTES = 32 * 2**20
+
+#pareto_front takes the sorted strategies in blocks of this many candidates,
+#the front found so far is compared with them in slices of at most
+#PARETO_SLICE strategies, starting at the front strategies with the best sums
+PARETO_BLOCK = 1024
+PARETO_SLICE = 1024
+#matrices and stacks of pairs with up to this many strategies are compared
+#all at once, each pair as a single block, instead of pair by pair
+PARETO_SMALL_PAIRS = 64
+
+def direction_codes(directions):
+    #'max' -> 1, 'min' -> -1, anything else -> 0 (criterion is ignored and scored 0.5)
+    directions = np.asarray(directions)
+    if directions.dtype.kind in 'iuf':
+        return np.sign(directions).astype(np.int8)
+    codes = np.zeros(directions.shape, dtype=np.int8)
+    for direction, code in DIRECTION_CODES.items():
+        codes[directions == direction] = code
+    return codes
+
+def _is_out_of_core(scores):
+    return isinstance(scores, np.memmap)
+
+#(start, end) slices of n rows, each row holding row_size values
+def _chunks(n, row_size):
+    rows = max(1, OUT_OF_CORE_CHUNK_BYTES // (8 * max(1, row_size)))
+    for start in range(0, n, rows):
+        yield start, min(start + rows, n)
+
+#float64 copy of one chunk of a memory-mapped array
+def _load(scores, start, end):
+    return np.asarray(scores[start:end], dtype=float)
+
+#per criterion min and max over the strategies, kept as (..., 1, criteria)
+#so they broadcast against the score matrix. a memory-mapped matrix is
+#reduced in one streaming pass
+def column_bounds(scores):
+    if not _is_out_of_core(scores):
+        return np.min(scores, axis=-2, keepdims=True), np.max(scores, axis=-2, keepdims=True)
+    if scores.ndim == 3:
+        #min/max are per pair, every chunk of pairs is reduced on its own
+        bounds = [column_bounds(_load(scores, start, end))
+                  for start, end in _chunks(scores.shape[0], scores.shape[1] * scores.shape[2])]
+        return np.concatenate([b[0] for b in bounds]), np.concatenate([b[1] for b in bounds])
+    min_vals = max_vals = None
+    for start, end in _chunks(scores.shape[0], scores.shape[1]):
+        chunk_min, chunk_max = column_bounds(_load(scores, start, end))
+        min_vals = chunk_min if min_vals is None else np.minimum(min_vals, chunk_min)
+        max_vals = chunk_max if max_vals is None else np.maximum(max_vals, chunk_max)
+    return min_vals, max_vals
+
+#bounds and per pair weights/directions of the pairs start:end, shared ones
+#are passed through unchanged
+def _pair_slice(values, start, end, ndim):
+    return values[start:end] if values.ndim == ndim else values
+
+#float64 memory-mapped array backed by an anonymous temporary file, removed
+#by the OS once the array is released
+def _temp_memmap(shape):
+    return np.memmap(tempfile.TemporaryFile(), dtype=float, mode="w+", shape=shape)
+
+#two-pass normalization of a memory-mapped matrix: min/max first, then every
+#chunk is normalized into out. without out the result goes to a temporary
+#file, so the normalized matrix is never held in memory as a whole
+def _normalize_out_of_core(scores, directions, bounds, out):
+    codes = direction_codes(directions)
+    if out is None:
+        out = _temp_memmap(scores.shape)
+    min_vals, max_vals = bounds if bounds is not None else column_bounds(scores)
+    if scores.ndim == 3:
+        for start, end in _chunks(scores.shape[0], scores.shape[1] * scores.shape[2]):
+            chunk_bounds = (_pair_slice(min_vals, start, end, 3), _pair_slice(max_vals, start, end, 3))
+            out[start:end] = normalize_data(_load(scores, start, end), _pair_slice(codes, start, end, 2),
+                                            chunk_bounds)
+    else:
+        for start, end in _chunks(scores.shape[0], scores.shape[1]):
+            out[start:end] = normalize_data(_load(scores, start, end), codes, (min_vals, max_vals))
+    return out
+
+#normalization function, works on one (strategies x criteria) matrix or a
+#stack of them (pairs x strategies x criteria); min/max are taken per pair.
+#bounds can pass in min/max already computed by column_bounds. memory-mapped
+#scores (float32 or float64) are normalized out of core into out, or into a
+#temporary memory-mapped file
+def normalize_data(scores, directions, bounds=None, out=None):
+    if _is_out_of_core(scores) or out is not None:
+        return _normalize_out_of_core(scores, directions, bounds, out)
+    scores = np.asarray(scores, dtype=float)
+    codes = direction_codes(directions)[..., None, :]
+
+    min_vals, max_vals = bounds if bounds is not None else column_bounds(scores)
+    range_vals = max_vals - min_vals
+    range_vals[range_vals == 0] = 1  #avoid division by zero
+
+    normalized_scores = np.where(codes < 0, max_vals - scores, scores - min_vals)
+    normalized_scores /= range_vals
+    #if the direction is neither max nor min the criterion is set to 0.5
+    normalized_scores[np.broadcast_to(codes == 0, normalized_scores.shape)] = 0.5
+
+    return normalized_scores
+
+#final score calculation
+def calculate_final_scores(normalized_scores, weights):
+    weights = np.asarray(weights, dtype=float)
+    if normalized_scores.ndim == 2 and weights.ndim == 1:
+        return np.dot(normalized_scores, weights)
+    return np.matmul(normalized_scores, weights[..., None])[..., 0]
+
+#batched evaluation: scores is (pairs x strategies x criteria), weights and
+#directions are either shared (criteria,) or per pair (pairs x criteria).
+#returns the final scores (pairs x strategies) and the index of the winning
+#strategy for every pair
+def evaluate_batch(scores, weights, directions):
+    if _is_out_of_core(scores):
+        return _evaluate_batch_out_of_core(scores, weights, directions)
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim != 3:
+        raise ValueError(f"Expected a (pairs x strategies x criteria) array, got shape {scores.shape}")
+    normalized_scores = normalize_data(scores, directions)
+    final_scores = calculate_final_scores(normalized_scores, weights)
+    winners = np.argmax(final_scores, axis=1)
+    return final_scores, winners
+
+#memory-mapped stack of pairs: min/max are per pair, so every chunk of pairs
+#is evaluated completely on its own
+def _evaluate_batch_out_of_core(scores, weights, directions):
+    if scores.ndim != 3:
+        raise ValueError(f"Expected a (pairs x strategies x criteria) array, got shape {scores.shape}")
+    weights = np.asarray(weights, dtype=float)
+    codes = direction_codes(directions)
+    final_scores = np.empty(scores.shape[:2])
+    for start, end in _chunks(scores.shape[0], scores.shape[1] * scores.shape[2]):
+        final_scores[start:end], _ = evaluate_batch(_load(scores, start, end), _pair_slice(weights, start, end, 2),
+                                                    _pair_slice(codes, start, end, 2))
+    return final_scores, np.argmax(final_scores, axis=1)
+
+#final scores of one memory-mapped (strategies x criteria) matrix in two
+#streaming passes, min/max first and then normalization and weighting chunk
+#by chunk. the normalized matrix is never held in memory as a whole
+def evaluate_out_of_core(scores, weights, directions, out=None):
+    if scores.ndim != 2:
+        raise ValueError(f"Expected a (strategies x criteria) array, got shape {scores.shape}")
+    weights = np.asarray(weights, dtype=float)
+    codes = direction_codes(directions)
+    bounds = column_bounds(scores)
+    if out is None:
+        out = np.empty(scores.shape[0])
+    for start, end in _chunks(scores.shape[0], scores.shape[1]):
+        normalized_scores = normalize_data(_load(scores, start, end), codes, bounds)
+        #same batched product as evaluate_integration, so the results match it
+        out[start:end] = calculate_final_scores(normalized_scores[None], weights[None])[0]
+    return out
+
+#(candidates x others) mask, True where the other strategy dominates the
+#candidate. built one criterion at a time on 2d masks. at least as good
+#everywhere with a larger sum is strictly better somewhere, only equal sums
+#(identical strategies, rounding) are checked criterion by criterion
+def _dominated_mask(candidates, others):
+    mask = others[:, 0] >= candidates[:, 0, None]
+    for j in range(1, candidates.shape[1]):
+        mask &= others[:, j] >= candidates[:, j, None]
+    rows, cols = np.nonzero(mask & (others.sum(axis=1) <= candidates.sum(axis=1)[:, None]))
+    mask[rows, cols] = (others[cols] > candidates[rows]).any(axis=1)
+    return mask
+
+#every strategy of a pair compared with every other one at once, for stacks
+#of small pairs. oriented is (pairs x strategies x criteria), higher is better
+def _pareto_small(oriented):
+    #one contiguous (pairs x strategies) slice per criterion
+    columns = np.ascontiguousarray(oriented.transpose(2, 0, 1))
+    #dominates[p, i, k] is True where strategy k dominates strategy i, see _dominated_mask
+    dominates = columns[0][:, None, :] >= columns[0][:, :, None]
+    for column in columns[1:]:
+        dominates &= column[:, None, :] >= column[:, :, None]
+    diagonal = np.arange(oriented.shape[1])
+    dominates[:, diagonal, diagonal] = False
+    sums = oriented.sum(axis=2)
+    pair, i, k = np.nonzero(dominates & (sums[:, None, :] <= sums[:, :, None]))
+    dominates[pair, i, k] = (oriented[pair, k] > oriented[pair, i]).any(axis=-1)
+    dominated = dominates.any(axis=2)
+    #a dominated strategy is also dominated by one that is not
+    dominators = dominates & ~dominated[:, None, :]
+    return np.where(dominated, dominators.argmax(axis=2), -1)
+
+#Pareto front of one (strategies x criteria) matrix or of every pair of a
+#stack. a strategy is dominated when another one is at least as good on every
+#criterion with a direction and better on one of them, it cannot win whatever
+#the weights are. returns dominated_by (..., strategies): -1 for the
+#strategies on the front, otherwise the index of a front strategy dominating it.
+#sort-filter skyline: the strategies are sorted by the sum of their scores
+#(oriented so higher is better), a strategy can only be dominated by one
+#sorted before it. every block of candidates is compared with the front found
+#so far and within itself, never all strategies with each other
+def pareto_front(scores, directions):
+    scores = np.asarray(scores, dtype=float)
+    codes = direction_codes(directions)
+    if scores.ndim == 3:
+        n_pairs, n_strategies, n_criteria = scores.shape
+        codes = np.broadcast_to(codes, (n_pairs, n_criteria))
+        if n_strategies > PARETO_SMALL_PAIRS:
+            dominated_by = np.empty(scores.shape[:2], dtype=np.intp)
+            for k in range(n_pairs):
+                dominated_by[k] = pareto_front(scores[k], codes[k])
+            return dominated_by
+        #criteria without a direction become 0 for every strategy and decide nothing
+        oriented = np.where(codes[:, None, :] == 0, 0.0, scores * codes[:, None, :])
+        step = max(1, PARETO_BLOCK * PARETO_SLICE // max(1, n_strategies ** 2))
+        return np.concatenate([_pareto_small(oriented[start:start + step])
+                               for start in range(0, n_pairs, step)] or [np.empty((0, n_strategies), np.intp)])
+    if scores.ndim != 2:
+        raise ValueError(f"Expected a (strategies x criteria) or (pairs x strategies x criteria) array, "
+                         f"got shape {scores.shape}")
+
+    active = codes != 0
+    oriented = scores[:, active] * codes[active]
+    n, n_criteria = oriented.shape
+    dominated_by = np.full(n, -1, dtype=np.intp)
+    if n < 2 or not n_criteria:
+        return dominated_by
+    if n <= PARETO_SMALL_PAIRS:
+        return _pareto_small(oriented[None])[0]
+
+    #ties of the sum are broken column by column, so a dominating strategy
+    #comes first even when rounding makes the sums equal
+    order = np.lexsort(tuple(-oriented[:, ::-1].T) + (-oriented.sum(axis=1),))
+    points = oriented[order]
+    front = np.empty(0, dtype=np.intp)
+    for start in range(0, n, PARETO_BLOCK):
+        block = points[start:start + PARETO_BLOCK]
+
+        #most dominated strategies are dominated by one of the first front
+        #strategies, the slices grow and only open candidates go on to the next
+        rest = np.arange(len(block))
+        first, size = 0, 64
+        while len(rest) and first < len(front):
+            front_slice = front[first:first + size]
+            dominated = _dominated_mask(block[rest], points[front_slice])
+            hit = dominated.any(axis=1)
+            dominated_by[order[start + rest[hit]]] = order[front_slice[dominated[hit].argmax(axis=1)]]
+            rest = rest[~hit]
+            first, size = first + size, min(2 * size, PARETO_SLICE)
+
+        #candidates dominated within the block are dominated by one that survives it
+        dominated = _dominated_mask(block[rest], block[rest])
+        inner = dominated.any(axis=1)
+        survivors = start + rest[~inner]
+        if inner.any():
+            dominated_by[order[start + rest[inner]]] = order[survivors[dominated[inner][:, ~inner].argmax(axis=1)]]
+        front = np.concatenate([front, survivors])
+    return dominated_by
+
+#evaluate_batch on the Pareto front only, dominated strategies are dropped
+#before normalization and scoring. min/max still come from all strategies,
+#so the front gets the scores of evaluate_batch (up to rounding in the last
+#digit) and the same winner, on ties the front strategy. returns the final scores
+#(pairs x strategies, nan for dominated strategies), the winners and
+#dominated_by as returned by pareto_front
+def evaluate_batch_pareto(scores, weights, directions):
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim != 3:
+        raise ValueError(f"Expected a (pairs x strategies x criteria) array, got shape {scores.shape}")
+    n_pairs, _, n_criteria = scores.shape
+    codes = np.broadcast_to(direction_codes(directions), (n_pairs, n_criteria))
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), (n_pairs, n_criteria))
+    dominated_by = pareto_front(scores, codes)
+
+    #every remaining strategy is scored as a pair of its own with the bounds of its pair
+    pair, strategy = np.nonzero(dominated_by < 0)
+    min_vals, max_vals = column_bounds(scores)
+    normalized_scores = normalize_data(scores[pair, strategy][:, None], codes[pair],
+                                       bounds=(min_vals[pair], max_vals[pair]))
+    final_scores = np.full(scores.shape[:2], np.nan)
+    final_scores[pair, strategy] = np.einsum("ij,ij->i", normalized_scores[:, 0], weights[pair])
+    winners = np.argmax(np.where(dominated_by < 0, final_scores, -np.inf), axis=1)
+    return final_scores, winners, dominated_by
+
+#single pair version: scores of the strategies on the front and, for every
+#dominated strategy, the strategy dominating it
+def evaluate_integration_pareto(strategies, weights, scores, directions):
+    final_scores, _, dominated_by = evaluate_batch_pareto(np.asarray(scores, dtype=float)[None],
+                                                          np.asarray(weights, dtype=float)[None],
+                                                          np.asarray(directions)[None])
+    results = {strategies[i]: final_scores[0, i] for i in np.flatnonzero(dominated_by[0] < 0)}
+    pruned = {strategies[i]: strategies[d] for i, d in enumerate(dominated_by[0]) if d >= 0}
+    return results, pruned
+
+#evaluation function, memory-mapped score matrices are evaluated out of core
+def evaluate_integration(strategies, weights, scores, directions):
+    if _is_out_of_core(scores):
+        final_scores = evaluate_out_of_core(scores, weights, directions)
+        return {strategies[i]: final_scores[i] for i in range(len(strategies))}
+    final_scores, _ = evaluate_batch(np.asarray(scores, dtype=float)[None],
+                                     np.asarray(weights, dtype=float)[None],
+                                     np.asarray(directions)[None])
+    return {strategies[i]: final_scores[0, i] for i in range(len(strategies))}
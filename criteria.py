@@ -0,0 +1,13 @@
+#criteria definitions shared by the GUI and the scoring code. kept free of
+#numpy/pandas imports so the GUI can start without loading them
+CATEGORY_TO_WEIGHT = {"Low": 0.1, "Medium": 0.3, "High": 0.5}
+
+DEFAULT_CRITERIA = [
+    "Contribution to PMI goals",
+    "Stakeholder support",
+    "User satisfaction",
+    "Integration cost",
+    "Integration time",
+    "Integration risk"
+]
+DEFAULT_DIRECTIONS = ["max", "max", "max", "min", "min", "min"]
@@ -1,17 +1,37 @@
 import tkinter as tk
-from tkinter import messagebox
-import numpy as np
-import matplotlib.pyplot as plt
+from tkinter import filedialog, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from calculations import evaluate_integration, save_results_to_csv
-from utils import ToolTip
-import json
+from criteria import CATEGORY_TO_WEIGHT, DEFAULT_CRITERIA, DEFAULT_DIRECTIONS
+from session_store import PAGE_SIZE, SessionStore
+from utils import ViewManager
+from worker import BackgroundWorker, WriteBehind
+import profiling
+import importlib
 import os
+import threading
 from datetime import datetime
-import csv
 
-CATEGORY_TO_WEIGHT = {"Low": 0.1, "Medium": 0.3, "High": 0.5}
+#numpy, pandas and matplotlib are not needed for the welcome screen, they are
+#imported on first use (evaluation, sensitivity analysis, plotting) and
+#warmed up in a background thread once the window is shown
+DEFERRED_MODULES = ("numpy", "calculations", "mcda", "stability", "result_cache", "incremental", "sensitivity",
+                    "results_chart", "results_export", "score_grid")
+WARM_UP_DELAY_MS = 200
+
+#strategies shown in the live ranking line, the rest is counted
+LIVE_RANKING_LENGTH = 6
+
+#results are appended to one columnar store in results/ (see results_export.py).
+#ISE_RESULTS_FORMAT=parquet, npy or csv picks the format. the default is npy:
+#every write is readable right away and survives a crash, a Parquet file of
+#the session only becomes readable when the window is closed
+RESULTS_FORMAT = os.environ.get("ISE_RESULTS_FORMAT") or "npy"
+
+#number of weight samples drawn for the interactive sensitivity analysis, the
+#fixed seed makes repeated runs reproducible and lets them be served from cache
+SENSITIVITY_SAMPLES = 200_000
+SENSITIVITY_SEED = 0
 
 INTEGRATION_WEIGHT_TEMPLATES = {
     "Absorption": {
@@ -48,8 +68,16 @@ INTEGRATION_WEIGHT_TEMPLATES = {
     }
 }
 
+def warm_up_imports(modules=DEFERRED_MODULES):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            #the import is retried (and the error reported) on first real use
+            pass
+
 class IntegrationGUI:
-    def __init__(self, root):
+    def __init__(self, root, warm_up=True):
         self.root = root
         self.root.title("Integration Strategy Evaluation")
         self.root.geometry("1000x700")
@@ -63,18 +91,48 @@ class IntegrationGUI:
 
         self.main_frame = ttk.Frame(root)
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        #screens are built once and hidden when left, see utils.ViewManager
+        self.views = ViewManager(self.main_frame)
 
         self.integration_pair_name_var = tk.StringVar()
-        self.session_history = []
+        self.extra_strategies_var = tk.StringVar()
+        #user defined criteria added to DEFAULT_CRITERIA, (name, direction)
+        self.custom_criteria = []
+        self.weight_vars = {}
+        #recycled criterion rows of the weights tab, see criterion_row
+        self.criterion_rows = []
+        #strategies the weight categories were last chosen for
+        self.input_strategies = None
+        self.session_store = None
+        self.result_exporter = None
+        self.results_chart = None
+        self.live_evaluator = None
+        self.live_evaluator_key = None
+        self.last_output = None
+        self.calculation_job = None
+        self.score_screen = 0
+
+        self.worker = BackgroundWorker(root)
+        self.write_behind = WriteBehind(on_error=self.on_write_failed)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.create_initial_gui()
 
+        if warm_up:
+            self.root.after(WARM_UP_DELAY_MS, self.start_warm_up)
+
+        #diagnostics panel, Ctrl+Shift+D
+        self.root.bind("<Control-D>", lambda e: self.show_diagnostics_window())
+
+    def start_warm_up(self):
+        threading.Thread(target=warm_up_imports, name="import-warm-up", daemon=True).start()
+
+    @profiling.timed("screen.create_initial_gui")
     def create_initial_gui(self):
-        # Clear old widgets before creating welcome
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        self.views.show("welcome", self.build_welcome_screen)
 
-        welcome_frame = ttk.Frame(self.main_frame, bootstyle="secondary")
+    def build_welcome_screen(self, frame):
+        welcome_frame = ttk.Frame(frame, bootstyle="secondary")
         welcome_frame.pack(fill="both", expand=True)
 
         left_frame = ttk.Frame(welcome_frame)
@@ -108,7 +166,7 @@ class IntegrationGUI:
         self.selected_types = {type_: tk.BooleanVar() for type_ in self.strategy_types}
 
         ttk.Label(input_frame,
-                  text="Select Strategy Types (2-4):",
+                  text="Select Strategy Types (at least 2):",
                   bootstyle="light").pack(pady=(10, 5), anchor="w")
 
         for type_ in self.strategy_types:
@@ -116,6 +174,11 @@ class IntegrationGUI:
                             text=type_,
                             variable=self.selected_types[type_]).pack(anchor="w")
 
+        ttk.Label(input_frame,
+                  text="Additional strategies or variants (comma separated):",
+                  bootstyle="light").pack(pady=(15, 5), anchor="w")
+        ttk.Entry(input_frame, textvariable=self.extra_strategies_var).pack(fill="x")
+
         enter_button = ttk.Button(input_frame,
                                   text="Continue →",
                                   bootstyle="success",
@@ -125,18 +188,23 @@ class IntegrationGUI:
 
     def get_strategy_count(self):
         self.selected_strategy_types = [type_ for type_, var in self.selected_types.items() if var.get()]
+        for name in self.extra_strategies_var.get().split(","):
+            name = name.strip()
+            if name and name not in self.selected_strategy_types:
+                self.selected_strategy_types.append(name)
         count = len(self.selected_strategy_types)
-        if count < 2 or count > 4:
-            messagebox.showerror("Error", "Please select between 2 and 4 strategy types.")
+        if count < 2:
+            messagebox.showerror("Error", "Please select or add at least 2 strategies.")
             return
         self.strategy_count = count
         self.create_input_screen()
 
+    @profiling.timed("screen.create_input_screen")
     def create_input_screen(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        self.views.show("input", self.build_input_screen, self.refresh_input_screen)
 
-        self.notebook = ttk.Notebook(self.main_frame)
+    def build_input_screen(self, frame):
+        self.notebook = ttk.Notebook(frame)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
 
         #tab1
@@ -150,46 +218,28 @@ class IntegrationGUI:
         weights_container = ttk.Frame(self.weights_frame)
         weights_container.pack(fill="both", expand=True, padx=40, pady=10)
 
-        self.criteria = [
-            "Contribution to PMI goals",
-            "Stakeholder support",
-            "User satisfaction",
-            "Integration cost",
-            "Integration time",
-            "Integration risk"
-        ]
-
-        self.criteria_names = ["Contribution to PMI goals", "Stakeholder support", "User satisfaction", "Integration cost", "Integration time", "Integration risk"]
-
-        #comboboxes
-        self.weight_vars = {}
-        self.weight_combos = []
-
-        avg_categories = self.get_average_categories_for_selected_strategies()
-
-        for i, criterion in enumerate(self.criteria):
-            row = ttk.Frame(weights_container)
-            row.pack(fill="x", pady=5)
-
-            ttk.Label(row,
-                      text=criterion,
-                      width=25,
-                      anchor="w").pack(side="left", padx=10)
-
-            weight_var = tk.StringVar()
-            combo = ttk.Combobox(row, textvariable=weight_var, values=["Low", "Medium", "High"], state="readonly")
-            default_cat = avg_categories.get(criterion, "Medium")
-            combo.set(default_cat)
-            combo.pack(side="left")
-
-            combo.bind("<<ComboboxSelected>>", self.update_weight_sum)
-
-            self.weight_vars[criterion] = weight_var
-            self.weight_combos.append(combo)
+        #one row per criterion, filled in by refresh_input_screen
+        self.criteria_frame = ttk.Frame(weights_container)
+        self.criteria_frame.pack(fill="x")
+        self.criterion_rows = []
+
+        #custom criteria
+        add_row = ttk.Frame(weights_container)
+        add_row.pack(fill="x", pady=(15, 5))
+        self.new_criterion_var = tk.StringVar()
+        self.new_direction_var = tk.StringVar(value="Higher is better")
+        ttk.Entry(add_row, textvariable=self.new_criterion_var, width=27).pack(side="left", padx=10)
+        ttk.Combobox(add_row, textvariable=self.new_direction_var, values=["Higher is better", "Lower is better"],
+                     state="readonly", width=16).pack(side="left")
+        ttk.Button(add_row,
+                   text="Add Criterion",
+                   bootstyle="info",
+                   command=self.add_criterion).pack(side="left", padx=10)
 
         self.current_sum_label = ttk.Label(weights_container, text="Current Sum of Weights: 0.00", bootstyle="light")
         self.current_sum_label.pack(pady=(10, 0))
-        self.update_weight_sum()
+        self.weights_ranking_label = ttk.Label(weights_container, text="", bootstyle="info")
+        self.weights_ranking_label.pack(pady=(10, 0))
 
         #tab2
         self.pair_frame = ttk.Frame(self.notebook)
@@ -205,7 +255,7 @@ class IntegrationGUI:
         pair_entry = ttk.Entry(pair_container, textvariable=self.integration_pair_name_var)
         pair_entry.pack(fill="x")
 
-        button_frame = ttk.Frame(self.main_frame)
+        button_frame = ttk.Frame(frame)
         button_frame.pack(fill="x", padx=20, pady=10)
 
         ttk.Button(button_frame,
@@ -218,6 +268,87 @@ class IntegrationGUI:
                    bootstyle="success",
                    command=self.process_input).pack(side="right", padx=5)
 
+    #widgets of one criterion on the weights tab. rows are reused when the
+    #criteria change, the direction label and Remove button only show for
+    #custom criteria
+    def criterion_row(self):
+        row = {"frame": ttk.Frame(self.criteria_frame), "var": tk.StringVar(), "criterion": None}
+        row["label"] = ttk.Label(row["frame"], width=25, anchor="w")
+        row["label"].pack(side="left", padx=10)
+        row["combo"] = ttk.Combobox(row["frame"], textvariable=row["var"], values=["Low", "Medium", "High"],
+                                    state="readonly")
+        row["combo"].pack(side="left")
+        row["combo"].bind("<<ComboboxSelected>>", self.update_weight_sum)
+        row["direction"] = ttk.Label(row["frame"], bootstyle="secondary")
+        row["remove"] = ttk.Button(row["frame"],
+                                   text="Remove",
+                                   bootstyle="outline-danger",
+                                   command=lambda: self.remove_criterion(row["criterion"]))
+        return row
+
+    #the weight categories chosen so far are kept, unless the strategies
+    #changed since: then they start from the strategy templates again
+    def refresh_input_screen(self):
+        selections = self.current_weight_selections() \
+            if self.input_strategies == self.selected_strategy_types else {}
+        self.input_strategies = list(self.selected_strategy_types)
+
+        self.criteria = list(DEFAULT_CRITERIA) + [name for name, _ in self.custom_criteria]
+        self.directions = list(DEFAULT_DIRECTIONS) + [direction for _, direction in self.custom_criteria]
+
+        self.criteria_names = list(self.criteria)
+
+        #comboboxes
+        self.weight_vars = {}
+        self.weight_combos = []
+
+        avg_categories = self.get_average_categories_for_selected_strategies()
+
+        while len(self.criterion_rows) < len(self.criteria):
+            self.criterion_rows.append(self.criterion_row())
+        for i, (row, criterion) in enumerate(zip(self.criterion_rows, self.criteria)):
+            row["criterion"] = criterion
+            row["label"].config(text=criterion)
+            row["combo"].set(selections.get(criterion) or avg_categories.get(criterion, "Medium"))
+            #hidden rows are always at the end, so packing keeps the order
+            if not row["frame"].winfo_manager():
+                row["frame"].pack(fill="x", pady=5)
+
+            if i >= len(DEFAULT_CRITERIA):
+                row["direction"].config(text="higher is better" if self.directions[i] == "max" else "lower is better")
+                row["direction"].pack(side="left", padx=10)
+                row["remove"].pack(side="left")
+            else:
+                row["direction"].pack_forget()
+                row["remove"].pack_forget()
+
+            self.weight_vars[criterion] = row["var"]
+            self.weight_combos.append(row["combo"])
+        for row in self.criterion_rows[len(self.criteria):]:
+            row["frame"].pack_forget()
+
+        self.update_weight_sum()
+
+    def current_weight_selections(self):
+        return {criterion: var.get() for criterion, var in self.weight_vars.items()}
+
+    def add_criterion(self):
+        name = self.new_criterion_var.get().strip()
+        if not name:
+            messagebox.showerror("Error", "Please enter a name for the criterion.")
+            return
+        if name in self.criteria:
+            messagebox.showerror("Error", f"Criterion '{name}' already exists.")
+            return
+        direction = "min" if self.new_direction_var.get() == "Lower is better" else "max"
+        self.custom_criteria.append((name, direction))
+        self.new_criterion_var.set("")
+        self.refresh_input_screen()
+
+    def remove_criterion(self, name):
+        self.custom_criteria = [c for c in self.custom_criteria if c[0] != name]
+        self.refresh_input_screen()
+
     def get_average_categories_for_selected_strategies(self):
         if not hasattr(self, 'selected_strategy_types') or not self.selected_strategy_types:
             return {crit: "Medium" for crit in self.criteria}
@@ -250,9 +381,43 @@ class IntegrationGUI:
         total_weight = sum(raw_weights)
         self.current_sum_label.config(text=f"Current Sum of Weights: {total_weight:.2f}")
 
+        #scores entered earlier for the same strategies and criteria are re-ranked live
+        if self.live_evaluator_matches(self.selected_strategy_types):
+            self.live_evaluator.set_weights(raw_weights)
+            self.weights_ranking_label.config(text=self.format_live_ranking())
+        else:
+            self.weights_ranking_label.config(text="")
+
+    def live_evaluator_matches(self, strategies):
+        return self.live_evaluator is not None and \
+            self.live_evaluator_key == (list(strategies), self.criteria, self.directions)
+
+    def format_live_ranking(self):
+        ranking = self.live_evaluator.ranking()
+        text = "Live ranking: " + "  >  ".join(f"{s} {sc:.4f}" for s, sc in ranking[:LIVE_RANKING_LENGTH])
+        if len(ranking) > LIVE_RANKING_LENGTH:
+            text += f"  (+{len(ranking) - LIVE_RANKING_LENGTH} more)"
+        return text
+
+    def format_stability(self, best_strategy, stability):
+        lines = [f"{best_strategy} stays best while one weight moves within (others rescaled):"]
+        for criterion, entry in stability.items():
+            low, high = entry["winner_interval"]
+            lines.append(f"{criterion}: {low:.2f} - {high:.2f} (now {entry['weight']:.2f})")
+        return "\n".join(lines)
+
+    def on_score_edited(self, row_idx, col_idx, value):
+        self.live_evaluator.set_score(row_idx, col_idx, value)
+        self.live_ranking_label.config(text=self.format_live_ranking())
+
+    def on_scores_replaced(self, matrix):
+        self.live_evaluator.set_scores(matrix)
+        self.live_ranking_label.config(text=self.format_live_ranking())
+
+    def on_score_invalid(self, row_idx, col_idx, text):
+        self.live_ranking_label.config(text=f"Invalid score '{text}' for {self.strategies[row_idx]}")
+
     def back_to_welcome(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
         self.create_initial_gui()
 
     def process_input(self):
@@ -282,42 +447,31 @@ class IntegrationGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Invalid input: {e}")
 
+    @profiling.timed("screen.get_strategy_scores")
     def get_strategy_scores(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        self.views.show("scores", self.build_scores_screen, self.refresh_scores_screen)
 
-        main_frame = ttk.Frame(self.main_frame)
+    def build_scores_screen(self, frame):
+        main_frame = ttk.Frame(frame)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
         ttk.Label(main_frame,
                   text="Evaluate Strategy Performance",
                   style="Title.TLabel").pack(pady=20)
 
-        table_frame = ttk.Frame(main_frame)
-        table_frame.pack(fill="both", expand=True)
-
-        ttk.Label(table_frame, text="Strategy", width=20, bootstyle="inverse-primary").grid(row=0, column=0, sticky="nsew")
-        for i, criterion in enumerate(self.criteria):
-            ttk.Label(table_frame,
-                      text=criterion,
-                      width=15,
-                      bootstyle="inverse-primary").grid(row=0, column=i + 1, sticky="nsew")
-
-        self.score_entries = []
-        for row_idx, strategy in enumerate(self.strategies):
-            ttk.Label(table_frame,
-                      text=strategy,
-                      width=20).grid(row=row_idx + 1, column=0, sticky="nsew")
+        #virtualized table, only the visible cells are drawn whatever the
+        #number of strategies and criteria. refresh_scores_screen fills it in
+        from score_grid import ScoreGrid
+        self.score_grid = ScoreGrid(main_frame, [], [], on_cell_changed=self.on_score_edited,
+                                    on_matrix_changed=self.on_scores_replaced, on_invalid=self.on_score_invalid)
+        self.score_grid.pack(fill="x")
 
-            row_entries = []
-            for col_idx in range(len(self.criteria)):
-                entry = ttk.Entry(table_frame, width=15, justify="center")
-                entry.grid(row=row_idx + 1, column=col_idx + 1, sticky="nsew")
-                row_entries.append(entry)
-            self.score_entries.append(row_entries)
+        self.live_ranking_label = ttk.Label(main_frame, text="", bootstyle="info")
+        self.live_ranking_label.pack(pady=(10, 0))
 
-        for i in range(len(self.criteria) + 1):
-            table_frame.grid_columnconfigure(i, weight=1)
+        #weight stability of the last calculated winner
+        self.stability_label = ttk.Label(main_frame, text="", bootstyle="light", justify="left")
+        self.stability_label.pack(pady=(10, 0))
 
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill="x", pady=20)
@@ -333,120 +487,451 @@ class IntegrationGUI:
                    command=self.show_session_history_window).pack(side="left", padx=5)
 
         ttk.Button(button_frame,
-                   text="Calculate Results",
-                   bootstyle="success",
-                   command=self.calculate_results).pack(side="right", padx=5)
+                   text="Sensitivity Analysis",
+                   bootstyle="info",
+                   command=self.show_sensitivity_window).pack(side="left", padx=5)
+
+        ttk.Button(button_frame,
+                   text="Paste",
+                   bootstyle="secondary",
+                   command=self.paste_scores).pack(side="left", padx=5)
+
+        ttk.Button(button_frame,
+                   text="Import Scores...",
+                   bootstyle="secondary",
+                   command=self.import_scores).pack(side="left", padx=5)
+
+        #only shown while profiling is enabled
+        self.diagnostics_button = ttk.Button(button_frame,
+                                             text="Diagnostics",
+                                             bootstyle="secondary",
+                                             command=self.show_diagnostics_window)
+
+        self.calculate_button = ttk.Button(button_frame,
+                                           text="Calculate Results",
+                                           bootstyle="success",
+                                           command=self.calculate_results)
+        self.calculate_button.pack(side="right", padx=5)
+
+        self.status_label = ttk.Label(button_frame, text="", bootstyle="warning")
+        self.status_label.pack(side="right", padx=10)
+
+        #the results chart is embedded here on the first calculation
+        self.chart_frame = ttk.Frame(main_frame)
+        self.chart_frame.pack(fill="both", expand=True)
+
+    def refresh_scores_screen(self):
+        #live evaluator, kept while the strategies and criteria stay the same so
+        #scores survive going back to the weights screen
+        from incremental import IncrementalEvaluator
+        if not self.live_evaluator_matches(self.strategies):
+            self.live_evaluator = IncrementalEvaluator(self.strategies, self.weights,
+                                                       [[0.0] * len(self.criteria) for _ in self.strategies],
+                                                       self.directions)
+            self.live_evaluator_key = (list(self.strategies), self.criteria, self.directions)
+        else:
+            self.live_evaluator.set_weights(self.weights)
+
+        from score_grid import HEADER_HEIGHT, ROW_HEIGHT
+        self.score_grid.reset(self.strategies, self.criteria, self.live_evaluator.scores)
+        self.score_grid.canvas.config(height=HEADER_HEIGHT + min(len(self.strategies), 12) * ROW_HEIGHT)
+
+        self.last_scores = None
+        self.last_output = None
+        #results of jobs started on an earlier visit of the screen are dropped
+        self.score_screen += 1
+        if self.calculation_job is not None:
+            self.calculation_job.cancel()
+            self.calculation_job = None
+        self.live_ranking_label.config(text=self.format_live_ranking())
+        self.stability_label.config(text="")
+        self.status_label.config(text="")
+        if profiling.enabled:
+            self.diagnostics_button.pack(side="left", padx=5, before=self.calculate_button)
+        else:
+            self.diagnostics_button.pack_forget()
+        #the chart of the last visit shows until the next calculation otherwise
+        if self.results_chart is not None:
+            self.results_chart.hide()
 
     def back_to_input(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
         self.create_input_screen()
 
+    #bulk read of the grid's NumPy matrix
+    def read_score_matrix(self):
+        return self.score_grid.get_matrix()
+
+    def paste_scores(self):
+        try:
+            self.score_grid.paste()
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Error", f"Could not paste scores: {e}")
+
+    def import_scores(self):
+        path = filedialog.askopenfilename(title="Import Scores",
+                                          filetypes=[("Score matrices", "*.csv *.tsv *.txt *.npy"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        from score_grid import load_matrix_file
+        try:
+            matrix = load_matrix_file(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not import scores: {e}")
+            return
+        rows, cols = self.score_grid.set_matrix(matrix)
+        if (rows, cols) != matrix.shape:
+            messagebox.showwarning("Warning", f"The file holds a {matrix.shape[0]} x {matrix.shape[1]} matrix, "
+                                              f"only the first {rows} x {cols} values fit the table.")
+
+    #parsing happens here on the main thread, scoring runs on the background
+    #worker and show_results is called back on the main thread
+    @profiling.timed("calculate_results")
     def calculate_results(self):
         try:
-            scores = []
-            for row in self.score_entries:
-                row_scores = []
-                for entry in row:
-                    val = float(entry.get()) if entry.get() else 0.0
-                    row_scores.append(val)
-                scores.append(row_scores)
-
-            scores = np.array(scores)
-            directions = ["max", "max", "max", "min", "min", "min"]
-
-            results = evaluate_integration(self.strategies, self.weights, scores, directions)
-
-            best_strategy = max(results, key=results.get)
-            best_score = results[best_strategy]
-
-            result_text = "\n".join(
-                f"{s}: {sc:.4f}" + ("  <-- Best result" if s == best_strategy else "")
-                for s, sc in results.items()
-            )
-            messagebox.showinfo("Results", f"Strategy Scores:\n\n{result_text}\n\nBest: {best_strategy} ({best_score:.4f})")
-
-            self.visualize_results(results, best_strategy)
-
-            #session history saving
-            self.save_session_history({
-                "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "integration_pair": self.integration_pair_name,
-                "strategies": self.strategies,
-                "weights": self.weights,
-                "scores": results,
-                "final_results": results
-            })
-
-            self.save_results_to_csv(results)
-
+            scores = self.read_score_matrix()
         except Exception as e:
             messagebox.showerror("Error", f"Invalid input: {e}")
+            return
 
+        strategies = list(self.strategies)
+        weights = list(self.weights)
+        directions = list(self.directions)
+        criteria = list(self.criteria)
+        pair_name = self.integration_pair_name
+        screen = self.score_screen
+
+        def evaluate(job):
+            import numpy as np
+            from mcda import evaluate_integration_methods
+            from result_cache import cached_evaluate_integration_pareto
+            from stability import weight_stability
+            matrix = np.array(scores)
+            with profiling.span("calculate_results.evaluate", strategies=len(strategies)):
+                #strategies dominated on every criterion are dropped before scoring,
+                #the method rankings and stability intervals still cover all of them
+                results, pruned = cached_evaluate_integration_pareto(strategies, weights, matrix, directions)
+                rankings = evaluate_integration_methods(strategies, weights, matrix, directions)
+                stability = weight_stability(strategies, weights, matrix, directions, criteria)
+            profiling.count("evaluations")
+            return matrix, results, rankings, stability, pruned
+
+        if self.calculation_job is not None:
+            self.calculation_job.cancel()
+        self.status_label.config(text="Calculating...")
+        self.calculation_job = self.worker.submit(
+            evaluate,
+            on_done=lambda out: self.show_results(screen, pair_name, directions, *out),
+            on_error=lambda e: self.on_calculation_failed(screen, e),
+            name="evaluate")
+
+    def on_calculation_failed(self, screen, error):
+        if screen == self.score_screen:
+            self.status_label.config(text="")
+        messagebox.showerror("Error", f"Invalid input: {error}")
+
+    def show_results(self, screen, pair_name, directions, scores, results, rankings=None, stability=None,
+                     pruned=None):
+        #the user navigated away while the job was running
+        if screen != self.score_screen:
+            return
+        self.calculation_job = None
+        self.status_label.config(text="")
+        self.last_scores = scores
+        self.last_directions = directions
+
+        best_strategy = max(results, key=results.get)
+        best_score = results[best_strategy]
+
+        #identical inputs give identical results, the chart and the exported
+        #results already show them
+        unchanged = self.last_output == (pair_name, results)
+        if not unchanged:
+            self.visualize_results(results, best_strategy)
+        if stability:
+            self.stability_label.config(text=self.format_stability(best_strategy, stability))
+
+        #session history and exported results are written in the background
+        record = {
+            "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "integration_pair": pair_name,
+            "strategies": self.strategies,
+            "weights": self.weights,
+            "scores": results,
+            "best_strategy": best_strategy,
+            "best_score": best_score
+        }
+        self.save_session_history(record)
+        if not unchanged:
+            self.export_results(record)
+        self.last_output = (pair_name, results)
+
+        result_text = "\n".join(
+            f"{s}: {sc:.4f}" + ("  <-- Best result" if s == best_strategy else "")
+            for s, sc in results.items()
+        )
+        message = f"Strategy Scores:\n\n{result_text}\n\nBest: {best_strategy} ({best_score:.4f})"
+        if rankings:
+            message += "\n\nRankings by method:\n" + "\n".join(
+                f"{name.upper()}: {' > '.join(r['ranking'])}" for name, r in rankings.items())
+        if pruned:
+            message += "\n\nDominated on every criterion, cannot win with any weights:\n" + "\n".join(
+                f"{strategy} (by {dominating})" for strategy, dominating in pruned.items())
+        with profiling.span("calculate_results.messagebox"):
+            messagebox.showinfo("Results", message)
+
+    def get_session_store(self):
+        if self.session_store is None:
+            self.session_store = SessionStore()
+        return self.session_store
+
+    def get_result_exporter(self):
+        if self.result_exporter is None:
+            from results_export import ResultExporter
+            self.result_exporter = ResultExporter(format=RESULTS_FORMAT)
+        return self.result_exporter
+
+    def on_write_failed(self, error):
+        #called from the write-behind thread
+        self.worker.post(messagebox.showerror, "Error", f"Failed to save results: {error}")
+
+    @profiling.timed("save_session_history")
     def save_session_history(self, record):
-        if not hasattr(self, 'session_history'):
-            self.session_history = []
-        self.session_history.append(record)
-
-        folder = "sessions"
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-
-        filename = os.path.join(folder, f"session_{self.integration_pair_name}.json")
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(self.session_history, f, indent=4)
+            self.write_behind.append(self.get_session_store(), record)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save session history: {e}")
 
-    def save_results_to_csv(self, results):
-        folder = "results"
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-
-        filename = os.path.join(folder, f"results_{self.integration_pair_name}.csv")
+    @profiling.timed("export_results")
+    def export_results(self, record):
         try:
-            with open(filename, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Strategy", "Score"])
-                for strategy, score in results.items():
-                    writer.writerow([strategy, score])
+            self.write_behind.append(self.get_result_exporter(), record)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save results to CSV: {e}")
+            messagebox.showerror("Error", f"Failed to save results: {e}")
+
+    def on_close(self):
+        if self.calculation_job is not None:
+            self.calculation_job.cancel()
+        self.worker.close()
+        #pending session records and results are written before exiting
+        self.write_behind.close(timeout=10)
+        if self.result_exporter is not None:
+            self.result_exporter.close()
+        self.root.destroy()
 
     def show_session_history_window(self):
+        try:
+            store = self.get_session_store()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open session history: {e}")
+            return
+
         win = tk.Toplevel(self.root)
         win.title("Session Evaluation History")
         win.geometry("800x400")
 
         ttk.Label(win, text="Session Evaluation History", style="Title.TLabel").pack(pady=10)
 
-        listbox = tk.Listbox(win, font=("Segoe UI", 10))
-        listbox.pack(fill="both", expand=True, padx=10, pady=10)
+        search_frame = ttk.Frame(win)
+        search_frame.pack(fill="x", padx=10)
+        ttk.Label(search_frame, text="Filter by pair name:").pack(side="left")
+        search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=search_var).pack(side="left", fill="x", expand=True, padx=5)
+
+        list_frame = ttk.Frame(win)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+        listbox = tk.Listbox(list_frame, font=("Segoe UI", 10))
+        listbox.pack(side="left", fill="both", expand=True)
+
+        #records are fetched one page at a time, newest first, and the next
+        #page is only loaded when the list is scrolled close to its end
+        state = {"before": None, "exhausted": False, "loading": False, "prefix": "", "pending": None}
+
+        def load_page():
+            state["loading"] = False
+            if state["exhausted"] or not win.winfo_exists():
+                return
+            records = store.page(PAGE_SIZE, state["before"], state["prefix"])
+            for rec in records:
+                best = f"{rec['best_strategy']} ({rec['best_score']:.4f})" if rec["best_strategy"] else "-"
+                listbox.insert(tk.END, f"{rec['datetime']} | Pair: {rec['integration_pair']} | Best: {best}")
+            if records:
+                state["before"] = (records[-1]["datetime"], records[-1]["id"])
+            state["exhausted"] = len(records) < PAGE_SIZE
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= 0.9 and not state["exhausted"] and not state["loading"]:
+                state["loading"] = True
+                win.after_idle(load_page)
+
+        def apply_filter():
+            state.update(before=None, exhausted=False, prefix=search_var.get().strip(), pending=None)
+            listbox.delete(0, tk.END)
+            load_page()
+
+        def on_search(*_):
+            if state["pending"] is not None:
+                win.after_cancel(state["pending"])
+            state["pending"] = win.after(200, apply_filter)
+
+        listbox.config(yscrollcommand=on_scroll)
+        scrollbar.config(command=listbox.yview)
+        search_var.trace_add("write", on_search)
+        load_page()
+
+        ttk.Button(win, text="Close", bootstyle="secondary", command=win.destroy).pack(pady=5)
+
+    def show_sensitivity_window(self):
+        if getattr(self, 'last_scores', None) is None:
+            messagebox.showerror("Error", "Please calculate results before running the sensitivity analysis.")
+            return
+
+        strategies = list(self.strategies)
+        weights = list(self.weights)
+        scores, directions = self.last_scores, self.last_directions
 
-        for rec in getattr(self, 'session_history', []):
-            best_strat = max(rec["scores"], key=rec["scores"].get)
-            display_text = f"{rec['datetime']} | Pair: {rec['integration_pair']} | Best: {best_strat} ({rec['scores'][best_strat]:.4f})"
-            listbox.insert(tk.END, display_text)
+        win = tk.Toplevel(self.root)
+        win.title("Weight Sensitivity Analysis")
+        win.geometry("900x400")
+
+        ttk.Label(win, text="Weight Sensitivity Analysis", style="Title.TLabel").pack(pady=10)
+        info_label = ttk.Label(win, text="Sampling weight vectors...", bootstyle="light")
+        info_label.pack()
+        progress = ttk.Progressbar(win, maximum=SENSITIVITY_SAMPLES, bootstyle="info")
+        progress.pack(fill="x", padx=10, pady=10)
+
+        def run(job):
+            from result_cache import cached_run_sensitivity
+            #only the strategies on the Pareto front are sampled
+            return cached_run_sensitivity(strategies, weights, scores, directions,
+                                          n_samples=SENSITIVITY_SAMPLES, seed=SENSITIVITY_SEED,
+                                          progress=job.report, cancel_event=job.cancel_event, pareto=True)
+
+        def on_progress(done, total):
+            if win.winfo_exists():
+                progress.config(value=done)
+
+        def on_done(analysis):
+            if win.winfo_exists():
+                progress.pack_forget()
+                cancel_button.pack_forget()
+                self.fill_sensitivity_window(win, info_label, analysis)
+
+        def on_error(e):
+            if win.winfo_exists():
+                win.destroy()
+            messagebox.showerror("Error", f"Sensitivity analysis failed: {e}")
+
+        def on_cancel():
+            if win.winfo_exists():
+                win.destroy()
+
+        job = self.worker.submit(run, on_done=on_done, on_error=on_error, on_progress=on_progress,
+                                 on_cancel=on_cancel, name="sensitivity")
+        cancel_button = ttk.Button(win, text="Cancel", bootstyle="danger", command=job.cancel)
+        cancel_button.pack(pady=5)
+        win.protocol("WM_DELETE_WINDOW", job.cancel)
+
+    def fill_sensitivity_window(self, win, info_label, analysis):
+        text = f"{analysis['samples']:,} weight vectors sampled around the current weights"
+        if analysis.get("pruned"):
+            text += "\nLeft out, dominated on every criterion: " + ", ".join(
+                f"{strategy} (by {dominating})" for strategy, dominating in analysis["pruned"].items())
+        info_label.config(text=text)
+        win.protocol("WM_DELETE_WINDOW", win.destroy)
+
+        strategies = list(analysis["win_probability"])
+
+        columns = ["Strategy", "Win probability", "Mean score", "P5", "P50", "P95", "Rank distribution"]
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=len(strategies))
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=220 if col == "Rank distribution" else 100, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for strategy in strategies:
+            pct = analysis["score_percentiles"][strategy]
+            ranks = " / ".join(f"{p:.0%}" for p in analysis["rank_distribution"][strategy])
+            tree.insert("", tk.END, values=(
+                strategy,
+                f"{analysis['win_probability'][strategy]:.1%}",
+                f"{analysis['mean_score'][strategy]:.4f}",
+                f"{pct[5]:.3f}", f"{pct[50]:.3f}", f"{pct[95]:.3f}",
+                ranks
+            ))
 
         ttk.Button(win, text="Close", bootstyle="secondary", command=win.destroy).pack(pady=5)
 
+    @profiling.timed("visualize_results")
     def visualize_results(self, results, best_strategy):
-        strategies = list(results.keys())
-        scores = list(results.values())
+        #one figure for the whole session, later calculations only update the bars
+        if self.results_chart is None:
+            from results_chart import ResultsChart
+            self.results_chart = ResultsChart()
+        self.results_chart.attach(self.chart_frame)
+        self.results_chart.update(results, best_strategy)
+
+    def show_diagnostics_window(self):
+        win = tk.Toplevel(self.root)
+        win.title("Diagnostics")
+        win.geometry("700x450")
 
-        plt.figure(figsize=(10, 6))
-        bars = plt.barh(strategies, scores, color='skyblue')
+        ttk.Label(win, text="Diagnostics", style="Title.TLabel").pack(pady=10)
 
-        for bar, strategy in zip(bars, strategies):
-            if strategy == best_strategy:
-                bar.set_color('orange')
+        enabled_var = tk.BooleanVar(value=profiling.enabled)
 
-        plt.xlabel('Final Score')
-        plt.title('Integration Strategy Evaluation Results')
-        plt.xlim(0, 1)
-        plt.grid(axis='x')
-        plt.show()
+        def toggle():
+            if enabled_var.get():
+                profiling.enable()
+            else:
+                profiling.disable()
+
+        ttk.Checkbutton(win, text="Record timing spans and counters",
+                        variable=enabled_var, command=toggle).pack(anchor="w", padx=10)
+
+        columns = ["Span", "Calls", "Total ms", "Mean ms", "Max ms"]
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=10)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=240 if col == "Span" else 100, anchor="w" if col == "Span" else "e")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        counters_label = ttk.Label(win, text="", bootstyle="light", justify="left")
+        counters_label.pack(anchor="w", padx=10)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            stats = profiling.summary()
+            for name, entry in sorted(stats.items(), key=lambda item: -item[1]["total_ms"]):
+                tree.insert("", tk.END, values=(name, entry["calls"], f"{entry['total_ms']:.2f}",
+                                                f"{entry['mean_ms']:.2f}", f"{entry['max_ms']:.2f}"))
+            counters = profiling.counters()
+            counters_label.config(text="  ".join(f"{k}: {v}" for k, v in sorted(counters.items())) or "No counters recorded")
+
+        def reset():
+            profiling.reset()
+            refresh()
+
+        def export():
+            path = filedialog.asksaveasfilename(parent=win, defaultextension=".json",
+                                                initialfile="trace.json",
+                                                filetypes=[("Chrome trace", "*.json")])
+            if path:
+                try:
+                    profiling.export_chrome_trace(path)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to export trace: {e}", parent=win)
+
+        button_frame = ttk.Frame(win)
+        button_frame.pack(fill="x", padx=10, pady=10)
+        ttk.Button(button_frame, text="Refresh", bootstyle="info", command=refresh).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", bootstyle="outline", command=reset).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Export Trace", bootstyle="success", command=export).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Close", bootstyle="secondary", command=win.destroy).pack(side="right", padx=5)
+        refresh()
 
 if __name__ == "__main__":
     root = ttk.Window(themename="darkly")
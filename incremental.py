@@ -0,0 +1,98 @@
+import numpy as np
+from calculations import calculate_final_scores, direction_codes, normalize_data
+
+#full recomputation after this many incremental updates, keeps floating
+#point drift of the running sums in check
+REFRESH_INTERVAL = 256
+
+#incremental evaluator for live re-scoring while the user edits weights and
+#scores. it caches the per-criterion min/max, the normalized matrix and the
+#weighted sums: changing a weight is a single column update of the weighted
+#sums, changing a score cell only renormalizes its column when the edit moves
+#that column's min or max. weights are normalized to sum to 1.0 the same way
+#process_input does, so results match evaluate_integration
+class IncrementalEvaluator:
+    def __init__(self, strategies, weights, scores, directions):
+        self.strategies = list(strategies)
+        self.scores = np.array(scores, dtype=float)
+        self.weights = np.array(weights, dtype=float)
+        self.codes = direction_codes(directions)
+        self.refresh()
+
+    def refresh(self):
+        self.min_vals = np.min(self.scores, axis=0)
+        self.max_vals = np.max(self.scores, axis=0)
+        self.normalized = normalize_data(self.scores, self.codes)
+        self.weighted = calculate_final_scores(self.normalized, self.weights)
+        self.total_weight = float(self.weights.sum())
+        self._updates = 0
+
+    def _count_update(self):
+        self._updates += 1
+        if self._updates >= REFRESH_INTERVAL:
+            self.refresh()
+
+    def _normalize(self, values, j):
+        low, high = self.min_vals[j], self.max_vals[j]
+        range_val = (high - low) or 1
+        if self.codes[j] > 0:
+            return (values - low) / range_val
+        if self.codes[j] < 0:
+            return (high - values) / range_val
+        return np.full_like(values, 0.5) if np.ndim(values) else 0.5
+
+    def set_weight(self, j, weight):
+        delta = float(weight) - self.weights[j]
+        if delta == 0:
+            return
+        self.weights[j] = weight
+        self.weighted += self.normalized[:, j] * delta
+        self.total_weight += delta
+        self._count_update()
+
+    def set_weights(self, weights):
+        for j, weight in enumerate(weights):
+            self.set_weight(j, weight)
+
+    def set_score(self, i, j, value):
+        old = self.scores[i, j]
+        value = float(value)
+        if value == old:
+            return
+        self.scores[i, j] = value
+
+        low, high = self.min_vals[j], self.max_vals[j]
+        if value < low or value > high or old == low or old == high:
+            column = self.scores[:, j]
+            new_low, new_high = column.min(), column.max()
+            if new_low != low or new_high != high:
+                #the column's range moved, renormalize the whole column
+                self.min_vals[j], self.max_vals[j] = new_low, new_high
+                new_column = self._normalize(column, j)
+                self.weighted += (new_column - self.normalized[:, j]) * self.weights[j]
+                self.normalized[:, j] = new_column
+                self._count_update()
+                return
+
+        new_value = self._normalize(value, j)
+        self.weighted[i] += (new_value - self.normalized[i, j]) * self.weights[j]
+        self.normalized[i, j] = new_value
+        self._count_update()
+
+    #bulk replacement of the score matrix (paste, import), recomputed in one go
+    def set_scores(self, scores):
+        self.scores = np.array(scores, dtype=float)
+        self.refresh()
+
+    def final_scores(self):
+        if self.total_weight and abs(self.total_weight - 1.0) > 0.01:
+            return self.weighted / self.total_weight
+        return self.weighted.copy()
+
+    def results(self):
+        final_scores = self.final_scores()
+        return {strategy: final_scores[i] for i, strategy in enumerate(self.strategies)}
+
+    #(strategy, score) pairs, best first
+    def ranking(self):
+        return sorted(self.results().items(), key=lambda item: item[1], reverse=True)
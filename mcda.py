@@ -0,0 +1,144 @@
+#multi-method MCDA engine. SAW (the weighted sum the GUI has always used),
+#TOPSIS and VIKOR score the same matrix in one pass: the intermediates they
+#have in common (per criterion min/max, the min-max normalized matrix, column
+#norms) are computed once per call and shared. works on one
+#(strategies x criteria) matrix or a stack of them (pairs x strategies x criteria),
+#weights and directions are shared (criteria,) or per pair (pairs x criteria).
+#further methods are added with @register_method
+from functools import cached_property
+
+import numpy as np
+
+from calculations import calculate_final_scores, column_bounds, direction_codes, normalize_data
+
+DEFAULT_METHODS = ("saw", "topsis", "vikor")
+#weight of the group utility against the individual regret in VIKOR
+VIKOR_V = 0.5
+
+#name -> (function(ctx, weights, **options) -> (pairs x strategies), higher_is_better)
+METHODS = {}
+
+def register_method(name, higher_is_better=True):
+    def decorator(func):
+        METHODS[name] = (func, higher_is_better)
+        return func
+    return decorator
+
+#intermediate arrays of one scoring pass, each one is computed the first
+#time a method asks for it
+class ScoringPass:
+    def __init__(self, scores, directions):
+        self.scores = np.asarray(scores, dtype=float)
+        self.codes = direction_codes(directions)
+        self.min_vals, self.max_vals = column_bounds(self.scores)
+
+    #(..., 1, criteria) codes, broadcast against the score matrix
+    @cached_property
+    def column_codes(self):
+        return self.codes[..., None, :]
+
+    #1.0 for max/min criteria, 0.0 for criteria without a direction. they do
+    #not separate the strategies, TOPSIS and VIKOR leave them out
+    @cached_property
+    def active(self):
+        return (self.column_codes != 0).astype(float)
+
+    @cached_property
+    def normalized(self):
+        return normalize_data(self.scores, self.codes, bounds=(self.min_vals, self.max_vals))
+
+    #euclidean norm of every criterion column, used by the vector normalization of TOPSIS
+    @cached_property
+    def column_norms(self):
+        norms = np.sqrt(np.einsum("...ij,...ij->...j", self.scores, self.scores))[..., None, :]
+        norms[norms == 0] = 1  #avoid division by zero
+        return norms
+
+    #best and worst raw value of every criterion (ideal and anti-ideal point)
+    @cached_property
+    def ideal(self):
+        return np.where(self.column_codes < 0, self.min_vals, self.max_vals)
+
+    @cached_property
+    def anti_ideal(self):
+        return np.where(self.column_codes < 0, self.max_vals, self.min_vals)
+
+def _column_weights(weights):
+    return np.asarray(weights, dtype=float)[..., None, :]
+
+#scales x - x.min to [0, 1] along the strategies, constant rows become 0
+def _rescale(values):
+    low = values.min(axis=-1, keepdims=True)
+    spread = values.max(axis=-1, keepdims=True) - low
+    spread[spread == 0] = 1
+    return (values - low) / spread
+
+@register_method("saw")
+def saw(ctx, weights, **options):
+    return calculate_final_scores(ctx.normalized, weights)
+
+#closeness to the ideal point in the weighted, vector normalized space.
+#the ideal and anti-ideal points are the column min/max divided by the
+#column norms, so the weighted matrix is only needed once
+@register_method("topsis")
+def topsis(ctx, weights, **options):
+    scale = _column_weights(weights) * ctx.active / ctx.column_norms
+    weighted = ctx.scores * scale
+    to_ideal = np.sqrt(np.square(weighted - ctx.ideal * scale).sum(axis=-1))
+    to_anti_ideal = np.sqrt(np.square(weighted - ctx.anti_ideal * scale).sum(axis=-1))
+    total = to_ideal + to_anti_ideal
+    #all strategies identical on every weighted criterion
+    return np.divide(to_anti_ideal, total, out=np.full_like(total, 0.5), where=total > 0)
+
+#compromise ranking: Q mixes the weighted sum of regrets (group utility S)
+#and the largest single regret (individual regret R), lower is better. the
+#regret of a strategy on a criterion is 1 - its min-max normalized score
+@register_method("vikor", higher_is_better=False)
+def vikor(ctx, weights, v=VIKOR_V, **options):
+    regret = (1 - ctx.normalized) * (_column_weights(weights) * ctx.active)
+    utility = regret.sum(axis=-1)
+    individual = regret.max(axis=-1)
+    return v * _rescale(utility) + (1 - v) * _rescale(individual)
+
+#rank 1 is the best strategy, ties keep the strategy order
+def rank(scores, higher_is_better=True):
+    order = np.argsort(-scores if higher_is_better else scores, axis=-1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, order.shape[-1] + 1), axis=-1)
+    return order, ranks
+
+#scores every requested method on the shared pass. returns
+#{method: {"scores", "ranks", "winners", "higher_is_better"}} with the batch
+#axis dropped again for a single matrix. options (e.g. v for VIKOR) are passed
+#to every method
+def evaluate_methods(scores, weights, directions, methods=DEFAULT_METHODS, **options):
+    scores = np.asarray(scores, dtype=float)
+    single = scores.ndim == 2
+    if scores.ndim not in (2, 3):
+        raise ValueError(f"Expected a (strategies x criteria) or (pairs x strategies x criteria) array, "
+                         f"got shape {scores.shape}")
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown MCDA method(s): {', '.join(unknown)}")
+
+    ctx = ScoringPass(scores, directions)
+    results = {}
+    for name in methods:
+        func, higher_is_better = METHODS[name]
+        method_scores = func(ctx, weights, **options)
+        order, ranks = rank(method_scores, higher_is_better)
+        results[name] = {"scores": method_scores, "ranks": ranks, "winners": order[..., 0],
+                         "higher_is_better": higher_is_better}
+    return results
+
+#single pair version keyed by strategy name, ranking lists the strategies best first
+def evaluate_integration_methods(strategies, weights, scores, directions, methods=DEFAULT_METHODS, **options):
+    results = evaluate_methods(scores, weights, directions, methods, **options)
+    out = {}
+    for name, result in results.items():
+        out[name] = {
+            "scores": {s: float(result["scores"][i]) for i, s in enumerate(strategies)},
+            "ranking": [strategies[i] for i in np.argsort(result["ranks"], kind="stable")],
+            "higher_is_better": result["higher_is_better"],
+        }
+    return out
@@ -0,0 +1,181 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from calculations import direction_codes, evaluate_batch
+from sensitivity import run_sensitivity
+
+#below this many pairs the pool startup costs more than it saves and the
+#batch is evaluated in-process
+DEFAULT_MIN_PARALLEL_PAIRS = 200_000
+#shards per worker, a few more shards than workers keeps the cores busy
+#when some shards finish early
+SHARDS_PER_WORKER = 4
+
+def _create_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm
+
+def _attach(specs):
+    shms, arrays = [], []
+    for name, shape, dtype in specs:
+        shm = shared_memory.SharedMemory(name=name)
+        shms.append(shm)
+        arrays.append(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return shms, arrays
+
+def _release(shms, unlink=False):
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:
+            #a view is still alive (e.g. held by a traceback), the mapping is
+            #dropped once it is garbage collected
+            pass
+        if unlink:
+            shm.unlink()
+
+def _spec(shm, array):
+    return (shm.name, array.shape, array.dtype.str)
+
+#worker side: scores, weights and direction codes are read from shared
+#memory and the shard's results are written straight into the shared
+#output buffers, nothing but the buffer names and the slice bounds is pickled
+def _evaluate_shard(specs, start, end):
+    shms, arrays = _attach(specs)
+    try:
+        scores, weights, codes, out, winners = arrays
+        out[start:end], winners[start:end] = evaluate_batch(scores[start:end], weights[start:end],
+                                                            codes[start:end])
+    finally:
+        arrays = scores = weights = codes = out = winners = None
+        _release(shms)
+    return start, end
+
+def _sensitivity_shard(specs, strategies, start, end, seed, kwargs):
+    shms, arrays = _attach(specs)
+    try:
+        scores, weights, codes = (np.array(array[start:end]) for array in arrays)
+    finally:
+        arrays = None
+        _release(shms)
+    return _sensitivity_local(strategies, scores, weights, codes, seed, kwargs, offset=start)
+
+def _sensitivity_local(strategies, scores, weights, codes, seed, kwargs, offset=0):
+    results = []
+    for i in range(scores.shape[0]):
+        #one seed per pair, so the result does not depend on how pairs are sharded
+        pair_seed = None if seed is None else np.random.SeedSequence([seed, offset + i])
+        results.append(run_sensitivity(strategies[i], weights[i], scores[i], codes[i],
+                                       seed=pair_seed, **kwargs))
+    return results
+
+def _shard_bounds(n_pairs, n_shards):
+    edges = np.linspace(0, n_pairs, n_shards + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+#parallel portfolio evaluation: pairs are sharded across a process pool and
+#the score matrices are passed through multiprocessing.shared_memory instead
+#of being pickled. results are merged by position, so they are identical to
+#evaluate_batch. the pool is reused across calls until close() is called
+class ParallelEvaluator:
+    def __init__(self, workers=None, min_parallel_pairs=DEFAULT_MIN_PARALLEL_PAIRS, parallel=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_pairs = min_parallel_pairs
+        self.parallel = parallel
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _use_pool(self, n_pairs):
+        return self.parallel and self.workers > 1 and n_pairs >= self.min_parallel_pairs
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _inputs(self, scores, weights, directions):
+        scores = np.ascontiguousarray(scores, dtype=float)
+        if scores.ndim != 3:
+            raise ValueError(f"Expected a (pairs x strategies x criteria) array, got shape {scores.shape}")
+        n_pairs, _, n_criteria = scores.shape
+        weights = np.ascontiguousarray(np.broadcast_to(np.asarray(weights, dtype=float), (n_pairs, n_criteria)))
+        codes = np.ascontiguousarray(np.broadcast_to(direction_codes(directions), (n_pairs, n_criteria)))
+        return scores, weights, codes
+
+    def evaluate(self, scores, weights, directions):
+        scores = np.asarray(scores)
+        if not self._use_pool(scores.shape[0]):
+            return evaluate_batch(scores, weights, directions)
+
+        scores, weights, codes = self._inputs(scores, weights, directions)
+        n_pairs, n_strategies, _ = scores.shape
+        out = np.zeros((n_pairs, n_strategies))
+        winners = np.zeros(n_pairs, dtype=np.int64)
+
+        arrays = (scores, weights, codes, out, winners)
+        buffers = []
+        try:
+            for array in arrays:
+                buffers.append(_create_shared(array))
+            specs = [_spec(shm, array) for shm, array in zip(buffers, arrays)]
+
+            pool = self._get_pool()
+            futures = [pool.submit(_evaluate_shard, specs, start, end)
+                       for start, end in _shard_bounds(n_pairs, self.workers * SHARDS_PER_WORKER)]
+            for future in futures:
+                future.result()
+
+            out[...] = np.ndarray(out.shape, dtype=out.dtype, buffer=buffers[3].buf)
+            winners[...] = np.ndarray(winners.shape, dtype=winners.dtype, buffer=buffers[4].buf)
+        finally:
+            _release(buffers, unlink=True)
+        return out, winners
+
+    #monte carlo sensitivity analysis for every pair, strategies is a list
+    #with the strategy names of each pair. with a seed the results do not
+    #depend on the number of workers. dominated strategies are dropped per
+    #pair before sampling unless pareto=False is passed (see run_sensitivity)
+    def sensitivity(self, strategies, scores, weights, directions, seed=None, **kwargs):
+        scores = np.asarray(scores)
+        if not self._use_pool(scores.shape[0]):
+            scores, weights, codes = self._inputs(scores, weights, directions)
+            return _sensitivity_local(strategies, scores, weights, codes, seed, kwargs)
+
+        scores, weights, codes = self._inputs(scores, weights, directions)
+        arrays = (scores, weights, codes)
+        buffers = []
+        try:
+            for array in arrays:
+                buffers.append(_create_shared(array))
+            specs = [_spec(shm, array) for shm, array in zip(buffers, arrays)]
+
+            pool = self._get_pool()
+            futures = [pool.submit(_sensitivity_shard, specs, strategies[start:end], start, end, seed, kwargs)
+                       for start, end in _shard_bounds(scores.shape[0], self.workers * SHARDS_PER_WORKER)]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        finally:
+            _release(buffers, unlink=True)
+        return results
+
+#one-off parallel evaluation, use ParallelEvaluator directly to reuse the pool
+def evaluate_batch_parallel(scores, weights, directions, workers=None,
+                            min_parallel_pairs=DEFAULT_MIN_PARALLEL_PAIRS, parallel=True):
+    with ParallelEvaluator(workers, min_parallel_pairs, parallel) as evaluator:
+        return evaluator.evaluate(scores, weights, directions)
@@ -0,0 +1,125 @@
+#opt-in hot-path instrumentation: timing spans and counters, exportable as a
+#Chrome trace (chrome://tracing, Perfetto). disabled by default, then span()
+#returns a shared no-op context manager and count() returns immediately.
+#set ISE_PROFILE=1 to enable it from the start or call enable()
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_EVENTS = 100_000
+
+enabled = os.environ.get("ISE_PROFILE", "") not in ("", "0")
+_events = deque(maxlen=MAX_EVENTS)
+_counters = {}
+_lock = threading.Lock()
+_origin_ns = time.perf_counter_ns()
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    with _lock:
+        _events.clear()
+        _counters.clear()
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args = dict(self.args, error=exc_type.__name__)
+        with _lock:
+            _events.append((self.name, self.start, end - self.start, threading.get_ident(), self.args))
+        return False
+
+def span(name, **args):
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+#decorator version of span(), the name defaults to the function name
+def timed(name=None):
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+        #counters are also recorded over time for the trace viewer
+        _events.append((name, time.perf_counter_ns(), None, threading.get_ident(), _counters[name]))
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+#per span name: calls, total, mean and max duration in milliseconds
+def summary():
+    with _lock:
+        events = list(_events)
+    stats = {}
+    for name, _, duration, _, _ in events:
+        if duration is None:
+            continue
+        entry = stats.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += duration / 1e6
+        entry["max_ms"] = max(entry["max_ms"], duration / 1e6)
+    for entry in stats.values():
+        entry["mean_ms"] = entry["total_ms"] / entry["calls"]
+    return stats
+
+def chrome_trace():
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    trace = []
+    for name, start, duration, tid, args in events:
+        ts = (start - _origin_ns) / 1000
+        if duration is None:
+            trace.append({"name": name, "ph": "C", "ts": ts, "pid": pid, "tid": tid, "args": {"value": args}})
+        else:
+            trace.append({"name": name, "ph": "X", "ts": ts, "dur": duration / 1000,
+                          "pid": pid, "tid": tid, "args": args})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f, default=str)
+    return path
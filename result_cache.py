@@ -0,0 +1,156 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import profiling
+from calculations import direction_codes, evaluate_batch, evaluate_integration, evaluate_integration_pareto
+
+DEFAULT_MAXSIZE = 256
+
+#stable content hash of an evaluation request. arrays are hashed as float64
+#bytes together with their shape, directions as their +1/-1/0 codes, so the
+#same inputs always give the same key regardless of list/array/dtype
+def stable_key(kind, strategies, weights, scores, directions, **params):
+    h = hashlib.blake2b(digest_size=20)
+    h.update(kind.encode())
+    h.update(json.dumps([str(s) for s in strategies]).encode())
+    for array in (np.asarray(weights, dtype=np.float64), np.asarray(scores, dtype=np.float64),
+                  direction_codes(directions)):
+        array = np.ascontiguousarray(array)
+        h.update(str(array.shape).encode())
+        h.update(array.tobytes())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+#bounded in-memory LRU with an optional on-disk tier. values are copied on
+#the way in and out, so callers can not modify cached results
+class ResultCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir and not os.path.exists(disk_dir):
+            os.makedirs(disk_dir)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                profiling.count("cache.hits")
+                return copy.deepcopy(self._entries[key])
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                profiling.count("cache.disk_hits")
+                self._remember(key, value)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        profiling.count("cache.misses")
+        return default
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            #write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+default_cache = ResultCache()
+
+def cached_evaluate_integration(strategies, weights, scores, directions, cache=None):
+    cache = cache if cache is not None else default_cache
+    key = stable_key("evaluate_integration", strategies, weights, scores, directions)
+    return cache.get_or_compute(key, lambda: evaluate_integration(strategies, weights, scores, directions))
+
+#(results of the Pareto front, {dominated strategy: dominating strategy})
+def cached_evaluate_integration_pareto(strategies, weights, scores, directions, cache=None):
+    cache = cache if cache is not None else default_cache
+    key = stable_key("evaluate_integration_pareto", strategies, weights, scores, directions)
+    return cache.get_or_compute(key, lambda: evaluate_integration_pareto(strategies, weights, scores, directions))
+
+def cached_evaluate_batch(scores, weights, directions, cache=None):
+    cache = cache if cache is not None else default_cache
+    key = stable_key("evaluate_batch", [], weights, scores, directions)
+    return cache.get_or_compute(key, lambda: evaluate_batch(scores, weights, directions))
+
+#sensitivity results are only cached for a fixed seed, unseeded runs are
+#random by definition and always recomputed. progress and cancel_event do
+#not change the result and are left out of the key. pareto is always part of
+#the key, entries from before the Pareto pre-filter are never reused
+def cached_run_sensitivity(strategies, weights, scores, directions, cache=None, seed=None,
+                           progress=None, cancel_event=None, pareto=True, **kwargs):
+    from sensitivity import run_sensitivity
+    kwargs["pareto"] = pareto
+    run = lambda: run_sensitivity(strategies, weights, scores, directions, seed=seed,
+                                  progress=progress, cancel_event=cancel_event, **kwargs)
+    if seed is None:
+        return run()
+    cache = cache if cache is not None else default_cache
+    key = stable_key("run_sensitivity", strategies, [] if weights is None else weights, scores, directions,
+                     seed=seed, **kwargs)
+    return cache.get_or_compute(key, run)
@@ -0,0 +1,74 @@
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+BAR_COLOR = 'skyblue'
+BEST_COLOR = 'orange'
+
+#results bar chart embedded in the Tk window. the figure is created once and
+#later results only change bar widths and colors: the static parts (axes,
+#labels, grid) are cached as a background and only the bars are redrawn and
+#blitted on top of it
+class ResultsChart:
+    def __init__(self, figsize=(8, 3), dpi=100):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = None
+        self.bars = []
+        self.strategies = None
+        self._background = None
+
+    #(re)attaches the chart to a Tk container, the figure itself is reused
+    def attach(self, master):
+        if self.canvas is not None and self.canvas.get_tk_widget().master is master:
+            if not self.canvas.get_tk_widget().winfo_manager():
+                self.canvas.get_tk_widget().pack(fill="both", expand=True)
+            return
+        if self.canvas is not None and self.canvas.get_tk_widget().winfo_exists():
+            self.canvas.get_tk_widget().destroy()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.draw_idle()
+
+    #hides the chart until the next attach, e.g. when its screen is shown again
+    def hide(self):
+        if self.canvas is not None and self.canvas.get_tk_widget().winfo_exists():
+            self.canvas.get_tk_widget().pack_forget()
+
+    def _build(self, strategies):
+        self.ax.clear()
+        self.bars = list(self.ax.barh(strategies, [0] * len(strategies), color=BAR_COLOR, animated=True))
+        self.ax.set_xlabel('Final Score')
+        self.ax.set_title('Integration Strategy Evaluation Results')
+        self.ax.set_xlim(0, 1)
+        self.ax.grid(axis='x')
+        self.figure.tight_layout()
+        self.strategies = list(strategies)
+        #a full draw is needed for the new axes, _on_draw refreshes the background
+        self.canvas.draw()
+
+    #every full redraw (first show, resize, rebuild) refreshes the cached
+    #background and paints the animated bars on top of it
+    def _on_draw(self, event=None):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+
+    def update(self, results, best_strategy):
+        strategies = list(results.keys())
+        if strategies != self.strategies:
+            self._build(strategies)
+
+        for bar, strategy in zip(self.bars, strategies):
+            bar.set_width(results[strategy])
+            bar.set_color(BEST_COLOR if strategy == best_strategy else BAR_COLOR)
+
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+        self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
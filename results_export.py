@@ -0,0 +1,340 @@
+#consolidated result export. every evaluation is appended as rows of one
+#columnar store (integration_pair, strategy, score, best) instead of a small
+#CSV file per pair:
+#  parquet  one Parquet file per exporter session under results_parquet/, a row
+#           group per appended batch. needs pyarrow. the file is written under
+#           a name starting with "_" and only renamed to part-*.parquet when the
+#           exporter is closed, load_results skips the unfinished ones
+#  npy      one memory-mapped .npy file per column under results_npy/, pair and
+#           strategy names are dictionary encoded like in Parquet. the row count
+#           in index.json is only updated after the columns are flushed, so a
+#           crash never exposes half-written rows
+#  csv      a single results.csv, kept for compatibility
+#the default is parquet when pyarrow is installed and npy otherwise.
+#load_results reads a store back memory-mapped, without copying the columns
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+import profiling
+
+DEFAULT_FOLDER = "results"
+PARQUET_DIR = "results_parquet"
+NPY_DIR = "results_npy"
+CSV_FILE = "results.csv"
+#rows preallocated by the first append to an npy store, capacity doubles after that
+INITIAL_CAPACITY = 4096
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def available_formats():
+    return (["parquet"] if _has_pyarrow() else []) + ["npy", "csv"]
+
+def default_format():
+    return "parquet" if _has_pyarrow() else "npy"
+
+#one batch of rows, dictionary encoded: row_pair and row_strategy index into
+#the pairs and strategies name lists of the batch
+class _Batch:
+    def __init__(self, pairs, strategies, row_pair, row_strategy, score, best):
+        self.pairs = pairs
+        self.strategies = strategies
+        self.row_pair = row_pair
+        self.row_strategy = row_strategy
+        self.score = score
+        self.best = best
+
+    def __len__(self):
+        return len(self.score)
+
+class ParquetStore:
+    def __init__(self, folder):
+        import pyarrow.parquet  # noqa: F401
+        self.folder = os.path.join(folder, PARQUET_DIR)
+        os.makedirs(self.folder, exist_ok=True)
+        #unique per exporter, several can be opened in the same second
+        name = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+        self.path = os.path.join(self.folder, name)
+        #pyarrow ignores files starting with "_" when it reads the folder
+        self._tmp_path = os.path.join(self.folder, "_" + name)
+        self._writer = None
+        self._size = 0
+
+    def write(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({
+            "integration_pair": pa.DictionaryArray.from_arrays(pa.array(batch.row_pair, pa.int32()),
+                                                               pa.array(batch.pairs, pa.string())),
+            "strategy": pa.DictionaryArray.from_arrays(pa.array(batch.row_strategy, pa.int32()),
+                                                       pa.array(batch.strategies, pa.string())),
+            "score": pa.array(batch.score, pa.float64()),
+            "best": pa.array(batch.best, pa.bool_()),
+        })
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+        self._writer.write_table(table)
+        return self._grown()
+
+    #bytes added to the part file since the last call, the footer is only
+    #written on close
+    def _grown(self):
+        size = os.path.getsize(self._tmp_path)
+        written, self._size = size - self._size, size
+        return written
+
+    def close(self):
+        if self._writer is None:
+            return 0
+        self._writer.close()
+        self._writer = None
+        written = self._grown()
+        os.replace(self._tmp_path, self.path)
+        return written
+
+class NpyStore:
+    COLUMNS = {"integration_pair": np.int32, "strategy": np.int32, "score": np.float64, "best": np.bool_}
+
+    def __init__(self, folder):
+        self.folder = os.path.join(folder, NPY_DIR)
+        os.makedirs(self.folder, exist_ok=True)
+        index = _read_npy_index(self.folder)
+        self.rows = index["rows"]
+        self.capacity = index["capacity"]
+        #names are kept in append-only JSON lines files, the index only counts them
+        self.pairs = self._load_names("pairs", index["pairs"])
+        self.strategies = self._load_names("strategies", index["strategies"])
+        self._pair_ids = {name: i for i, name in enumerate(self.pairs)}
+        self._strategy_ids = {name: i for i, name in enumerate(self.strategies)}
+        self._columns = {}
+        if self.capacity:
+            for name in self.COLUMNS:
+                self._columns[name] = np.load(self._path(name), mmap_mode="r+")
+
+    def _path(self, name):
+        return os.path.join(self.folder, f"{name}.npy")
+
+    #names appended by a write that never made it into the index are dropped
+    def _load_names(self, kind, count):
+        names = _read_names(self.folder, kind, count + 1)
+        if len(names) > count:
+            names = names[:count]
+            with open(os.path.join(self.folder, f"{kind}.jsonl"), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(name) + "\n" for name in names)
+        return names
+
+    #codes of names and the bytes written for the new ones
+    def _ids(self, names, table, ids, kind):
+        new = []
+        codes = np.empty(len(names), dtype=np.int32)
+        for k, name in enumerate(names):
+            if name not in ids:
+                ids[name] = len(table)
+                table.append(name)
+                new.append(name)
+            codes[k] = ids[name]
+        if not new:
+            return codes, 0
+        data = "".join(json.dumps(name) + "\n" for name in new).encode("utf-8")
+        with open(os.path.join(self.folder, f"{kind}.jsonl"), "ab") as f:
+            f.write(data)
+        return codes, len(data)
+
+    #moves the columns to bigger files, the old rows are copied over.
+    #returns the bytes copied
+    def _grow(self, needed):
+        capacity = max(needed, 2 * self.capacity, INITIAL_CAPACITY)
+        written = 0
+        for name, dtype in self.COLUMNS.items():
+            tmp_path = self._path(name) + ".tmp"
+            column = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(capacity,))
+            if self.rows:
+                column[:self.rows] = self._columns[name][:self.rows]
+                written += column[:self.rows].nbytes
+            column.flush()
+            #the old map has to be released before its file can be replaced
+            self._columns.pop(name, None)
+            del column
+            os.replace(tmp_path, self._path(name))
+            self._columns[name] = np.load(self._path(name), mmap_mode="r+")
+        self.capacity = capacity
+        return written + self._write_index()
+
+    def _write_index(self):
+        return _write_json(os.path.join(self.folder, "index.json"),
+                           {"rows": self.rows, "capacity": self.capacity,
+                            "pairs": len(self.pairs), "strategies": len(self.strategies)})
+
+    def write(self, batch):
+        pair_codes, pair_bytes = self._ids(batch.pairs, self.pairs, self._pair_ids, "pairs")
+        strategy_codes, strategy_bytes = self._ids(batch.strategies, self.strategies, self._strategy_ids,
+                                                   "strategies")
+        written = pair_bytes + strategy_bytes
+        start, end = self.rows, self.rows + len(batch)
+        if end > self.capacity:
+            written += self._grow(end)
+        values = {"integration_pair": pair_codes[batch.row_pair], "strategy": strategy_codes[batch.row_strategy],
+                  "score": batch.score, "best": batch.best}
+        for name, column in self._columns.items():
+            column[start:end] = values[name]
+            column.flush()
+            written += column[start:end].nbytes
+        self.rows = end
+        return written + self._write_index()
+
+    def close(self):
+        for column in self._columns.values():
+            column.flush()
+        self._columns.clear()
+        return 0
+
+class CsvStore:
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, CSV_FILE)
+
+    def write(self, batch):
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            start = f.tell()
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["Integration pair", "Strategy", "Score", "Best"])
+            writer.writerows(zip([batch.pairs[i] for i in batch.row_pair],
+                                 [batch.strategies[i] for i in batch.row_strategy],
+                                 batch.score.tolist(), batch.best.astype(int).tolist()))
+            return f.tell() - start
+
+    def close(self):
+        return 0
+
+STORES = {"parquet": ParquetStore, "npy": NpyStore, "csv": CsvStore}
+
+#appends evaluation results to one store. safe to share between threads
+class ResultExporter:
+    def __init__(self, folder=DEFAULT_FOLDER, format=None):
+        self.format = format or default_format()
+        if self.format not in STORES:
+            raise ValueError(f"Unknown result format '{self.format}', expected one of {', '.join(STORES)}")
+        self.folder = folder
+        self._store = STORES[self.format](folder)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _write(self, batch):
+        if not len(batch):
+            return
+        with self._lock, profiling.span("results_export.write", format=self.format, rows=len(batch)):
+            written = self._store.write(batch)
+        profiling.count("rows_written.results", len(batch))
+        profiling.count("bytes_written.results", written)
+
+    def append(self, pair_name, results, best_strategy=None):
+        self.append_many([{"integration_pair": pair_name, "scores": results, "best_strategy": best_strategy}])
+
+    #records are dicts with integration_pair, scores ({strategy: score}) and
+    #optionally best_strategy, the same shape as the session history records
+    def append_many(self, records):
+        pairs, strategies, strategy_ids = [], [], {}
+        row_pair, row_strategy, score, best = [], [], [], []
+        for record in records:
+            results = record["scores"]
+            best_strategy = record.get("best_strategy") or max(results, key=results.get)
+            pairs.append(record["integration_pair"])
+            for strategy, value in results.items():
+                if strategy not in strategy_ids:
+                    strategy_ids[strategy] = len(strategies)
+                    strategies.append(strategy)
+                row_pair.append(len(pairs) - 1)
+                row_strategy.append(strategy_ids[strategy])
+                score.append(value)
+                best.append(strategy == best_strategy)
+        self._write(_Batch(pairs, strategies, np.array(row_pair, dtype=np.int32),
+                           np.array(row_strategy, dtype=np.int32), np.array(score, dtype=np.float64),
+                           np.array(best, dtype=bool)))
+
+    #vectorized path for evaluate_batch output: final_scores is (pairs x strategies)
+    #for the shared strategies list, winners defaults to the argmax per pair
+    def append_arrays(self, pair_names, strategies, final_scores, winners=None):
+        final_scores = np.asarray(final_scores, dtype=np.float64)
+        n_pairs, n_strategies = final_scores.shape
+        if winners is None:
+            winners = np.argmax(final_scores, axis=1)
+        self._write(_Batch(list(pair_names), list(strategies),
+                           np.repeat(np.arange(n_pairs, dtype=np.int32), n_strategies),
+                           np.tile(np.arange(n_strategies, dtype=np.int32), n_pairs),
+                           final_scores.ravel(),
+                           (np.arange(n_strategies) == np.asarray(winners)[:, None]).ravel()))
+
+    def close(self):
+        with self._lock:
+            written = self._store.close()
+        profiling.count("bytes_written.results", written)
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        written = f.tell()
+    os.replace(tmp_path, path)
+    return written
+
+def _read_npy_index(folder):
+    try:
+        with open(os.path.join(folder, "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"rows": 0, "capacity": 0, "pairs": 0, "strategies": 0}
+
+def _read_names(folder, kind, count):
+    names = []
+    try:
+        with open(os.path.join(folder, f"{kind}.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                if len(names) == count:
+                    break
+                names.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return names
+
+#reads a store written by ResultExporter. npy returns a dict of read-only
+#memory-mapped columns (integration_pair and strategy are codes into the
+#pairs and strategies lists), parquet a memory-mapped pyarrow Table of the
+#closed part files and csv a pandas DataFrame
+def load_results(folder=DEFAULT_FOLDER, format=None):
+    format = format or default_format()
+    if format == "npy":
+        folder = os.path.join(folder, NPY_DIR)
+        index = _read_npy_index(folder)
+        result = {}
+        for name in NpyStore.COLUMNS:
+            path = os.path.join(folder, f"{name}.npy")
+            result[name] = np.load(path, mmap_mode="r")[:index["rows"]] if index["rows"] else \
+                np.empty(0, dtype=NpyStore.COLUMNS[name])
+        result["pairs"] = _read_names(folder, "pairs", index["pairs"])
+        result["strategies"] = _read_names(folder, "strategies", index["strategies"])
+        return result
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(os.path.join(folder, PARQUET_DIR), memory_map=True)
+    if format == "csv":
+        import pandas as pd
+        return pd.read_csv(os.path.join(folder, CSV_FILE))
+    raise ValueError(f"Unknown result format '{format}', expected one of {', '.join(STORES)}")
@@ -0,0 +1,382 @@
+import csv
+import io
+import os
+import tkinter as tk
+
+import numpy as np
+import ttkbootstrap as ttk
+
+ROW_HEIGHT = 26
+COLUMN_WIDTH = 120
+ROW_HEADER_WIDTH = 170
+HEADER_HEIGHT = 44
+
+#parses a pasted or imported block of numbers (tab, comma or semicolon
+#separated). a header row and a label column without numbers in them are
+#dropped, empty cells are 0 like empty entries. the conversion runs once over
+#the whole block instead of cell by cell
+def parse_matrix_text(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("No values to read.")
+    sample = lines[0]
+    delimiter = "\t" if "\t" in sample else ";" if ";" in sample else ","
+    rows = [[cell.strip() for cell in row] for row in csv.reader(io.StringIO("\n".join(lines)), delimiter=delimiter)]
+    width = max(len(row) for row in rows)
+    cells = np.array([row + [""] * (width - len(row)) for row in rows], dtype=object)
+
+    def is_number(value):
+        try:
+            float(value)
+        except ValueError:
+            return False
+        return True
+
+    #only a row (column) without any number in it counts as header (labels)
+    if len(cells) > 1 and not any(is_number(v) for v in cells[0] if v):
+        cells = cells[1:]
+    if cells.shape[1] > 1 and not any(is_number(v) for v in cells[:, 0] if v):
+        cells = cells[:, 1:]
+    cells[cells == ""] = "0"
+    try:
+        return cells.astype(str).astype(float)
+    except ValueError:
+        bad = next(v for v in cells.flat if not is_number(v))
+        raise ValueError(f"Invalid score '{bad}' in pasted data.") from None
+
+#a whole score matrix from a .npy, .csv, .tsv or .txt file
+def load_matrix_file(path):
+    if os.path.splitext(path)[1].lower() == ".npy":
+        matrix = np.load(path)
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2D matrix in {path}, got shape {matrix.shape}")
+        return np.asarray(matrix, dtype=float)
+    with open(path, newline="", encoding="utf-8") as f:
+        return parse_matrix_text(f.read())
+
+#virtualized score table: the matrix lives in a NumPy array and the canvas only
+#draws the rows and columns that are visible, so building, scrolling and
+#destroying it costs the same for 4 x 6 and 10 000 x 50 cells. a single entry
+#widget is moved over the cell being edited. values are read in bulk with
+#get_matrix(), paste (Ctrl+V) and set_matrix() write whole blocks at once.
+#
+#callbacks: on_cell_changed(row, col, value) while a cell is typed into,
+#on_matrix_changed(matrix) after a paste or import, on_invalid(row, col, text)
+#for text that is not a number
+class ScoreGrid(ttk.Frame):
+    def __init__(self, master, row_labels, column_labels, values=None, on_cell_changed=None,
+                 on_matrix_changed=None, on_invalid=None):
+        super().__init__(master)
+        self.row_labels = list(row_labels)
+        self.column_labels = list(column_labels)
+        shape = (len(self.row_labels), len(self.column_labels))
+        self.values = np.zeros(shape) if values is None else np.array(values, dtype=float).reshape(shape)
+        #cells holding text that is not a number, {(row, col): text}
+        self.invalid = {}
+        self.on_cell_changed = on_cell_changed
+        self.on_matrix_changed = on_matrix_changed
+        self.on_invalid = on_invalid
+        self.top_row = 0
+        self.left_column = 0
+        self.active = (0, 0)
+        self._editing = None
+        self._original = None
+
+        colors = ttk.Style().colors
+        self.colors = {"bg": colors.inputbg, "fg": colors.inputfg, "header_bg": colors.primary,
+                       "header_fg": colors.selectfg, "grid": colors.border, "active": colors.info,
+                       "invalid": colors.danger}
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, background=self.colors["bg"], takefocus=1)
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.hbar = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.editor = ttk.Entry(self.canvas, justify="center")
+        self.editor.bind("<Return>", lambda e: self._finish_edit(1, 0))
+        self.editor.bind("<Tab>", lambda e: self._finish_edit(0, 1))
+        self.editor.bind("<Escape>", lambda e: self._cancel_edit())
+        self.editor.bind("<FocusOut>", lambda e: self._finish_edit(0, 0) if self._editing else None)
+        self.editor.bind("<KeyRelease>", self._on_editor_key)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Double-Button-1>", lambda e: self._start_edit())
+        self.canvas.bind("<MouseWheel>", lambda e: self.yview("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.xview("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Key>", self._on_key)
+        for key, move in (("<Up>", (-1, 0)), ("<Down>", (1, 0)), ("<Left>", (0, -1)), ("<Right>", (0, 1)),
+                          ("<Tab>", (0, 1))):
+            self.canvas.bind(key, lambda e, m=move: self.move_active(*m) or "break")
+        self.canvas.bind("<Return>", lambda e: self._start_edit())
+        self.canvas.bind("<F2>", lambda e: self._start_edit())
+        self.canvas.bind("<Delete>", lambda e: self.set_cell(*self.active, 0.0))
+        self.canvas.bind("<Control-v>", lambda e: self._paste_clipboard() or "break")
+        self.editor.bind("<Control-v>", lambda e: self._paste_clipboard() or "break")
+
+    #-- reading and writing values
+
+    #copy of the score matrix, raises ValueError while a cell holds invalid text
+    def get_matrix(self):
+        if self.invalid:
+            (row, col), text = next(iter(self.invalid.items()))
+            raise ValueError(f"Invalid score '{text}' for {self.row_labels[row]} / {self.column_labels[col]}")
+        return self.values.copy()
+
+    #writes a block of values with its top left corner at (row, col), values
+    #outside the table are dropped. returns the (rows, cols) written
+    def set_block(self, block, row=0, col=0):
+        block = np.atleast_2d(np.asarray(block, dtype=float))
+        rows = min(block.shape[0], self.values.shape[0] - row)
+        cols = min(block.shape[1], self.values.shape[1] - col)
+        self.values[row:row + rows, col:col + cols] = block[:rows, :cols]
+        for cell in [c for c in self.invalid if row <= c[0] < row + rows and col <= c[1] < col + cols]:
+            del self.invalid[cell]
+        self.redraw()
+        if self.on_matrix_changed is not None:
+            self.on_matrix_changed(self.values.copy())
+        return rows, cols
+
+    def set_matrix(self, matrix):
+        return self.set_block(matrix, 0, 0)
+
+    def set_cell(self, row, col, value):
+        self.values[row, col] = value
+        self.invalid.pop((row, col), None)
+        self.redraw()
+        if self.on_cell_changed is not None:
+            self.on_cell_changed(row, col, value)
+
+    #reuses the grid for another table, no callbacks are fired
+    def reset(self, row_labels, column_labels, values=None):
+        if self._editing:
+            self._editing = None
+            self.editor.place_forget()
+        self.row_labels = list(row_labels)
+        self.column_labels = list(column_labels)
+        shape = (len(self.row_labels), len(self.column_labels))
+        self.values = np.zeros(shape) if values is None else np.array(values, dtype=float).reshape(shape)
+        self.invalid.clear()
+        self.top_row = self.left_column = 0
+        self.active = (0, 0)
+        self.redraw()
+
+    #pastes tabular text (the clipboard by default) at the active cell
+    def paste(self, text=None):
+        if text is None:
+            text = self.clipboard_get()
+        if self._editing:
+            self._cancel_edit()
+        return self.set_block(parse_matrix_text(text), *self.active)
+
+    def _paste_clipboard(self):
+        try:
+            self.paste()
+        except (ValueError, tk.TclError) as e:
+            if self.on_invalid is not None:
+                self.on_invalid(*self.active, str(e))
+
+    #-- scrolling, only whole rows and columns are scrolled
+
+    def _visible_rows(self):
+        return max(1, (self.canvas.winfo_height() - HEADER_HEIGHT) // ROW_HEIGHT)
+
+    def _visible_columns(self):
+        return max(1, (self.canvas.winfo_width() - ROW_HEADER_WIDTH) // COLUMN_WIDTH)
+
+    def _scroll(self, first, count, visible, args):
+        if args[0] == "moveto":
+            first = int(round(float(args[1]) * count))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (visible if args[2] == "pages" else 1)
+            first += step
+        return max(0, min(first, count - visible))
+
+    def yview(self, *args):
+        self.top_row = self._scroll(self.top_row, self.values.shape[0], self._visible_rows(), args)
+        self.redraw()
+
+    def xview(self, *args):
+        self.left_column = self._scroll(self.left_column, self.values.shape[1], self._visible_columns(), args)
+        self.redraw()
+
+    def see(self, row, col):
+        rows, cols = self._visible_rows(), self._visible_columns()
+        if row < self.top_row:
+            self.top_row = row
+        elif row >= self.top_row + rows:
+            self.top_row = row - rows + 1
+        if col < self.left_column:
+            self.left_column = col
+        elif col >= self.left_column + cols:
+            self.left_column = col - cols + 1
+
+    #-- drawing
+
+    def _cell_box(self, row, col):
+        x = ROW_HEADER_WIDTH + (col - self.left_column) * COLUMN_WIDTH
+        y = HEADER_HEIGHT + (row - self.top_row) * ROW_HEIGHT
+        return x, y, x + COLUMN_WIDTH, y + ROW_HEIGHT
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        n_rows, n_cols = self.values.shape
+        last_row = min(n_rows, self.top_row + self._visible_rows() + 1)
+        last_col = min(n_cols, self.left_column + self._visible_columns() + 1)
+        c = self.colors
+
+        canvas.create_rectangle(0, 0, ROW_HEADER_WIDTH, HEADER_HEIGHT, fill=c["header_bg"], outline=c["grid"])
+        canvas.create_text(8, HEADER_HEIGHT // 2, text="Strategy", anchor="w", fill=c["header_fg"])
+        for col in range(self.left_column, last_col):
+            x0, _, x1, _ = self._cell_box(0, col)
+            canvas.create_rectangle(x0, 0, x1, HEADER_HEIGHT, fill=c["header_bg"], outline=c["grid"])
+            canvas.create_text((x0 + x1) // 2, HEADER_HEIGHT // 2, text=self.column_labels[col],
+                               width=COLUMN_WIDTH - 8, justify="center", fill=c["header_fg"])
+
+        for row in range(self.top_row, last_row):
+            _, y0, _, y1 = self._cell_box(row, 0)
+            canvas.create_rectangle(0, y0, ROW_HEADER_WIDTH, y1, fill=c["bg"], outline=c["grid"])
+            canvas.create_text(8, (y0 + y1) // 2, text=self.row_labels[row], anchor="w", fill=c["fg"],
+                               width=ROW_HEADER_WIDTH - 12)
+            for col in range(self.left_column, last_col):
+                x0, y0, x1, y1 = self._cell_box(row, col)
+                invalid = self.invalid.get((row, col))
+                outline = c["active"] if (row, col) == self.active else c["grid"]
+                canvas.create_rectangle(x0, y0, x1, y1, fill=c["bg"], outline=outline,
+                                        width=2 if (row, col) == self.active else 1)
+                value = self.values[row, col]
+                text = invalid if invalid is not None else (f"{value:g}" if value else "")
+                canvas.create_text((x0 + x1) // 2, (y0 + y1) // 2, text=text,
+                                   fill=c["invalid"] if invalid is not None else c["fg"])
+
+        self.vbar.set(*self._fractions(self.top_row, self._visible_rows(), n_rows))
+        self.hbar.set(*self._fractions(self.left_column, self._visible_columns(), n_cols))
+        if self._editing:
+            self._place_editor()
+
+    @staticmethod
+    def _fractions(first, visible, count):
+        if not count:
+            return 0.0, 1.0
+        return first / count, min(1.0, (first + visible) / count)
+
+    #-- selection and editing
+
+    def _cell_at(self, x, y):
+        if x < ROW_HEADER_WIDTH or y < HEADER_HEIGHT:
+            return None
+        row = self.top_row + (y - HEADER_HEIGHT) // ROW_HEIGHT
+        col = self.left_column + (x - ROW_HEADER_WIDTH) // COLUMN_WIDTH
+        if row >= self.values.shape[0] or col >= self.values.shape[1]:
+            return None
+        return row, col
+
+    def _on_click(self, event):
+        if self._editing:
+            self._finish_edit(0, 0)
+        self.canvas.focus_set()
+        cell = self._cell_at(event.x, event.y)
+        if cell is not None:
+            self.active = cell
+            self.redraw()
+
+    def move_active(self, d_row, d_col):
+        row = max(0, min(self.active[0] + d_row, self.values.shape[0] - 1))
+        col = max(0, min(self.active[1] + d_col, self.values.shape[1] - 1))
+        self.active = (row, col)
+        self.see(row, col)
+        self.redraw()
+
+    def _on_key(self, event):
+        #typing a number starts editing the active cell
+        if event.char and (event.char.isdigit() or event.char in "-+.,"):
+            self._start_edit(event.char)
+            return "break"
+
+    def _place_editor(self):
+        row, col = self._editing
+        x0, y0, x1, y1 = self._cell_box(row, col)
+        visible = self.top_row <= row < self.top_row + self._visible_rows() + 1 and \
+            self.left_column <= col < self.left_column + self._visible_columns() + 1
+        if visible:
+            self.editor.place(x=x0 + 1, y=y0 + 1, width=x1 - x0 - 2, height=y1 - y0 - 2)
+        else:
+            self.editor.place_forget()
+
+    def _start_edit(self, initial=None):
+        row, col = self.active
+        self._editing = self.active
+        #restored by Escape, typing already updates the value live
+        self._original = (self.values[row, col], self.invalid.get((row, col)))
+        self.see(row, col)
+        self.editor.delete(0, tk.END)
+        if initial is not None:
+            self.editor.insert(0, initial)
+        else:
+            text = self.invalid.get((row, col))
+            value = self.values[row, col]
+            self.editor.insert(0, text if text is not None else (f"{value:g}" if value else ""))
+            self.editor.select_range(0, tk.END)
+        self.redraw()
+        self.editor.focus_set()
+        return "break"
+
+    def _parse_editor(self):
+        text = self.editor.get().strip()
+        try:
+            return float(text) if text else 0.0, text
+        except ValueError:
+            return None, text
+
+    #live update while typing, like the per-cell entries did
+    def _on_editor_key(self, event):
+        if not self._editing or event.keysym in ("Return", "Tab", "Escape"):
+            return
+        row, col = self._editing
+        value, text = self._parse_editor()
+        if value is None:
+            self.invalid[(row, col)] = text
+            if self.on_invalid is not None:
+                self.on_invalid(row, col, text)
+            return
+        self.values[row, col] = value
+        self.invalid.pop((row, col), None)
+        if self.on_cell_changed is not None:
+            self.on_cell_changed(row, col, value)
+
+    def _finish_edit(self, d_row, d_col):
+        if not self._editing:
+            return "break"
+        row, col = self._editing
+        self._editing = None
+        self.editor.place_forget()
+        value, text = self._parse_editor()
+        if value is None:
+            self.invalid[(row, col)] = text
+            if self.on_invalid is not None:
+                self.on_invalid(row, col, text)
+        else:
+            self.set_cell(row, col, value)
+        self.canvas.focus_set()
+        self.move_active(d_row, d_col)
+        return "break"
+
+    def _cancel_edit(self):
+        row, col = self._editing
+        self._editing = None
+        self.editor.place_forget()
+        value, text = self._original
+        if text is None:
+            self.set_cell(row, col, value)
+        else:
+            self.invalid[(row, col)] = text
+            self.redraw()
+        self.canvas.focus_set()
+        return "break"
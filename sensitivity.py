@@ -0,0 +1,114 @@
+from concurrent.futures import CancelledError
+
+import numpy as np
+from calculations import column_bounds, normalize_data, pareto_front
+
+DEFAULT_SAMPLES = 1_000_000
+DEFAULT_CHUNK_SIZE = 65_536
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+#resolution of the score histograms used for the percentiles, scores of
+#normalized weight vectors always lie in [0, 1]
+HISTOGRAM_BINS = 2000
+
+#draws n weight vectors that each sum to 1.
+#'dirichlet' samples around base_weights (uniformly over the simplex if no
+#base is given), a higher concentration keeps the samples closer to the base.
+#'perturb' multiplies every base weight by a uniform factor in [1-spread, 1+spread]
+def sample_weights(n, base_weights=None, method='dirichlet', concentration=50.0,
+                   spread=0.2, n_criteria=None, rng=None):
+    rng = np.random.default_rng(rng)
+    if base_weights is not None:
+        base = np.asarray(base_weights, dtype=float)
+        base = base / base.sum()
+    elif n_criteria is not None:
+        base = np.full(n_criteria, 1.0 / n_criteria)
+    else:
+        raise ValueError("Either base_weights or n_criteria is required.")
+
+    if method == 'dirichlet':
+        alpha = base * concentration if base_weights is not None else np.ones_like(base)
+        return rng.dirichlet(alpha, size=n)
+    if method == 'perturb':
+        weights = base * rng.uniform(1 - spread, 1 + spread, size=(n, base.size))
+        np.clip(weights, 0, None, out=weights)
+        weights /= weights.sum(axis=1, keepdims=True)
+        return weights
+    raise ValueError(f"Unknown sampling method '{method}'.")
+
+#monte carlo weight sensitivity analysis for a single integration pair.
+#the score matrix is normalized once, every chunk of sampled weight vectors
+#is then scored with one matrix product, so memory stays bounded by
+#chunk_size no matter how many samples are drawn.
+#progress(done, total) is called after every chunk, setting cancel_event
+#(a threading.Event) stops the run with CancelledError before the next chunk.
+#with pareto the strategies dominated on every criterion are dropped before
+#sampling, they cannot win with any weights. the results only hold the
+#strategies on the Pareto front and "pruned" maps every dropped strategy to
+#one dominating it. min/max still come from all strategies, so the front
+#scores the same as without pruning
+def run_sensitivity(strategies, weights, scores, directions, n_samples=DEFAULT_SAMPLES,
+                    method='dirichlet', chunk_size=DEFAULT_CHUNK_SIZE,
+                    percentiles=DEFAULT_PERCENTILES, concentration=50.0, spread=0.2, seed=None,
+                    progress=None, cancel_event=None, pareto=True):
+    scores = np.asarray(scores, dtype=float)
+    bounds = column_bounds(scores)
+    pruned = {}
+    if pareto:
+        dominated_by = pareto_front(scores, directions)
+        front = np.flatnonzero(dominated_by < 0)
+        pruned = {strategies[i]: strategies[d] for i, d in enumerate(dominated_by) if d >= 0}
+        strategies = [strategies[i] for i in front]
+        scores = scores[front]
+    normalized_scores = normalize_data(scores, directions, bounds)
+    n_strategies = normalized_scores.shape[0]
+    rng = np.random.default_rng(seed)
+
+    win_counts = np.zeros(n_strategies, dtype=np.int64)
+    rank_counts = np.zeros((n_strategies, n_strategies), dtype=np.int64)
+    histograms = np.zeros((n_strategies, HISTOGRAM_BINS), dtype=np.int64)
+    score_sums = np.zeros(n_strategies)
+    strategy_offsets = np.arange(n_strategies)
+
+    done = 0
+    while done < n_samples:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        n = min(chunk_size, n_samples - done)
+        sampled = sample_weights(n, weights, method, concentration, spread,
+                                 n_criteria=normalized_scores.shape[1], rng=rng)
+        final_scores = sampled @ normalized_scores.T  #(n x strategies)
+
+        win_counts += np.bincount(np.argmax(final_scores, axis=1), minlength=n_strategies)
+
+        order = np.argsort(-final_scores, axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, strategy_offsets[None, :], axis=1)
+        rank_counts += np.bincount((strategy_offsets * n_strategies + ranks).ravel(),
+                                   minlength=n_strategies * n_strategies).reshape(n_strategies, n_strategies)
+
+        bins = np.clip((final_scores * HISTOGRAM_BINS).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        histograms += np.bincount((strategy_offsets * HISTOGRAM_BINS + bins).ravel(),
+                                  minlength=n_strategies * HISTOGRAM_BINS).reshape(n_strategies, HISTOGRAM_BINS)
+        score_sums += final_scores.sum(axis=0)
+        done += n
+        if progress is not None:
+            progress(done, n_samples)
+
+    cumulative = np.cumsum(histograms, axis=1)
+    score_percentiles = {}
+    for i, strategy in enumerate(strategies):
+        #upper edge of the first bin whose cumulative count reaches the percentile
+        score_percentiles[strategy] = {
+            p: float(np.searchsorted(cumulative[i], p / 100 * n_samples) + 1) / HISTOGRAM_BINS
+            for p in percentiles
+        }
+
+    return {
+        "samples": n_samples,
+        "method": method,
+        "win_probability": {s: float(win_counts[i] / n_samples) for i, s in enumerate(strategies)},
+        "rank_distribution": {s: (rank_counts[i] / n_samples).tolist() for i, s in enumerate(strategies)},
+        "mean_score": {s: float(score_sums[i] / n_samples) for i, s in enumerate(strategies)},
+        "score_percentiles": score_percentiles,
+        "pruned": pruned,
+    }
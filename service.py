@@ -0,0 +1,301 @@
+#local HTTP/JSON evaluation service for other tools, standard library only.
+#
+#  python service.py                     serve on 127.0.0.1:8765
+#  python service.py --port 9000 --batch-size 512 --max-wait-ms 2
+#
+#  POST /evaluate   one pair in the batch_cli JSON format, or a list of them
+#                   {"integration_pair": "ERP A/B", "strategies": [...],
+#                    "weights": [...], "scores": [[...], ...], "directions": [...]}
+#                   answers with the batch_cli result record(s)
+#  GET  /health     status, queue depth and request/batch counters
+#  GET  /metrics    latency histograms (queue wait, evaluation, total) and batch sizes
+#
+#concurrent requests are coalesced into micro-batches: the first queued pair
+#opens a batch that is evaluated on the vectorized path once it holds
+#--batch-size pairs or --max-wait-ms have passed. the queue is bounded, when
+#it is full new requests get 503 right away instead of piling up (backpressure)
+import argparse
+import asyncio
+import json
+import sys
+import time
+from bisect import bisect_left
+from http import HTTPStatus
+
+import profiling
+from batch_cli import evaluate_stream, pair_from_json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_QUEUE = 10_000
+MAX_BODY_BYTES = 16 * 2**20
+#upper bucket bounds of the latency histograms in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+class ServiceOverloaded(Exception):
+    pass
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    #upper bound of the bucket holding quantile q, the last bucket reports the max seen
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        buckets = {f"le_{bound:g}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0, "max": self.max,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+                "buckets": buckets}
+
+class _Request:
+    __slots__ = ("pair", "future", "queued")
+
+    def __init__(self, pair, future):
+        self.pair = pair
+        self.future = future
+        self.queued = time.perf_counter()
+
+class EvaluationService:
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 max_queue=DEFAULT_MAX_QUEUE):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.started = time.time()
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.batches = 0
+        self.latency_ms = {"queue_wait": Histogram(LATENCY_BUCKETS_MS), "evaluation": Histogram(LATENCY_BUCKETS_MS),
+                           "total": Histogram(LATENCY_BUCKETS_MS)}
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self._queue = None
+        self._batcher = None
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    #queues parsed pairs all or none, returns one future per pair. it never
+    #awaits, so no other request can take the queue slots between the check
+    #and the puts
+    def _enqueue(self, pairs):
+        if self._queue.qsize() + len(pairs) > self.max_queue:
+            self.rejected += len(pairs)
+            raise ServiceOverloaded(f"Queue is full ({self.max_queue} pairs), retry later.")
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in pairs]
+        for pair, future in zip(pairs, futures):
+            self._queue.put_nowait(_Request(pair, future))
+        self.requests += len(pairs)
+        return futures
+
+    #queues one parsed pair and waits for its result
+    async def evaluate(self, pair):
+        return await self._enqueue([pair])[0]
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0].queued + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            #the vectorized evaluation runs off the event loop so requests keep being accepted
+            try:
+                results = await loop.run_in_executor(None, self._evaluate, [r.pair for r in batch])
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            end = time.perf_counter()
+
+            self.batches += 1
+            self.batch_sizes.observe(len(batch))
+            for request, result in zip(batch, results):
+                self.latency_ms["queue_wait"].observe((start - request.queued) * 1000)
+                self.latency_ms["evaluation"].observe((end - start) * 1000)
+                self.latency_ms["total"].observe((end - request.queued) * 1000)
+                #the client may have disconnected in the meantime
+                if not request.future.done():
+                    request.future.set_result(result)
+
+    def _evaluate(self, pairs):
+        with profiling.span("service.batch", size=len(pairs)):
+            return list(evaluate_stream(pairs, batch_size=len(pairs)))
+
+    def health(self):
+        return {"status": "ok", "uptime_s": round(time.time() - self.started, 3),
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "max_queue": self.max_queue, "batch_size": self.batch_size, "max_wait_ms": self.max_wait * 1000,
+                "requests": self.requests, "rejected": self.rejected, "errors": self.errors, "batches": self.batches}
+
+    def metrics(self):
+        return {"latency_ms": {name: h.snapshot() for name, h in self.latency_ms.items()},
+                "batch_size": self.batch_sizes.snapshot()}
+
+    async def _evaluate_body(self, body):
+        data = json.loads(body)
+        records = data if isinstance(data, list) else [data]
+        pairs = [pair_from_json(rec, f"pair_{i + 1}") for i, rec in enumerate(records)]
+        #a list is accepted or rejected as a whole
+        results = await asyncio.gather(*self._enqueue(pairs))
+        return results if isinstance(data, list) else results[0]
+
+    async def _route(self, method, path, body):
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, self.health()
+        if path == "/metrics" and method == "GET":
+            return HTTPStatus.OK, self.metrics()
+        if path == "/evaluate":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST."}
+            try:
+                return HTTPStatus.OK, await self._evaluate_body(body)
+            except ServiceOverloaded as e:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+            except (ValueError, KeyError, TypeError) as e:
+                self.errors += 1
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid pair: {e}"}
+            except Exception as e:
+                self.errors += 1
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Evaluation failed: {e}"}
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+    #minimal HTTP/1.1 with keep-alive, enough for local JSON clients
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line."}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length."}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {"error": f"Body larger than {MAX_BODY_BYTES} bytes."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **kwargs):
+    service = EvaluationService(**kwargs)
+    server = await service.start(host, port)
+    print(f"Evaluation service listening on http://{host}:{service.port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve evaluate_integration over local HTTP/JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to bind, keep it on localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="largest micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="latency budget for filling a micro-batch")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="queued pairs before requests are rejected with 503")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, batch_size=args.batch_size, max_wait_ms=args.max_wait_ms,
+                          max_queue=args.max_queue))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
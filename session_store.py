@@ -0,0 +1,172 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+import profiling
+
+DEFAULT_DB_PATH = os.path.join("sessions", "sessions.db")
+PAGE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    integration_pair TEXT NOT NULL,
+    datetime TEXT NOT NULL,
+    strategies TEXT NOT NULL,
+    weights TEXT NOT NULL,
+    scores TEXT NOT NULL,
+    best_strategy TEXT,
+    best_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_pair_time ON evaluations (integration_pair, datetime);
+CREATE INDEX IF NOT EXISTS idx_evaluations_time ON evaluations (datetime);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+#meta key set once the old JSON session files have been imported
+_JSON_IMPORTED = "json_sessions_imported"
+
+_COLUMNS = "id, integration_pair, datetime, strategies, weights, scores, best_strategy, best_score"
+_INSERT = ("INSERT INTO evaluations (integration_pair, datetime, strategies, weights, scores, best_strategy, "
+           "best_score) VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+def _to_record(row):
+    return {
+        "id": row[0],
+        "integration_pair": row[1],
+        "datetime": row[2],
+        "strategies": json.loads(row[3]),
+        "weights": json.loads(row[4]),
+        "scores": json.loads(row[5]),
+        "best_strategy": row[6],
+        "best_score": row[7],
+    }
+
+#append-only session history backed by sqlite. every evaluation is one
+#INSERT in its own transaction, so a save costs the same no matter how long
+#the history is and a crash never leaves a half-written file behind.
+#records are indexed by pair name and timestamp
+class SessionStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.import_json_sessions(folder or ".")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    #the best strategy is precomputed on save (or taken from the record when
+    #the caller already knows it) so listings never have to scan the scores
+    @staticmethod
+    def _row(record):
+        scores = {s: float(v) for s, v in record["scores"].items()}
+        best_strategy = record.get("best_strategy")
+        if best_strategy not in scores:
+            best_strategy = max(scores, key=scores.get) if scores else None
+        return (
+            record["integration_pair"],
+            record["datetime"],
+            json.dumps(list(record["strategies"])),
+            json.dumps([float(w) for w in record["weights"]]),
+            json.dumps(scores),
+            best_strategy,
+            scores[best_strategy] if best_strategy else None,
+        )
+
+    def append(self, record):
+        return self.append_many([record])
+
+    #appends several records in one transaction, returns the id of the last one
+    def append_many(self, records):
+        rows = [self._row(record) for record in records]
+        if not rows:
+            return None
+        with profiling.span("session_store.append", records=len(rows)):
+            with self._lock, self._conn:
+                self._conn.executemany(_INSERT, rows)
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        profiling.count("bytes_written.sessions", sum(len(v) for row in rows for v in row[:5]))
+        return last_id
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_to_record(row) for row in rows]
+
+    #latest n evaluations, newest first, optionally for a single pair
+    def latest(self, integration_pair=None, n=10):
+        if integration_pair is None:
+            return self._query(f"SELECT {_COLUMNS} FROM evaluations ORDER BY datetime DESC, id DESC LIMIT ?", (n,))
+        return self._query(f"SELECT {_COLUMNS} FROM evaluations WHERE integration_pair = ? "
+                           "ORDER BY datetime DESC, id DESC LIMIT ?", (integration_pair, n))
+
+    #evaluations with start <= datetime < end, oldest first. timestamps use
+    #the "%Y-%m-%d %H:%M:%S" format the GUI writes, so they sort as text
+    def between(self, start, end, integration_pair=None):
+        if integration_pair is None:
+            return self._query(f"SELECT {_COLUMNS} FROM evaluations WHERE datetime >= ? AND datetime < ? "
+                               "ORDER BY datetime, id", (start, end))
+        return self._query(f"SELECT {_COLUMNS} FROM evaluations WHERE integration_pair = ? "
+                           "AND datetime >= ? AND datetime < ? ORDER BY datetime, id",
+                           (integration_pair, start, end))
+
+    #keyset pagination for the history window, newest first. "before" is the
+    #(datetime, id) of the last record of the previous page. pair_prefix
+    #filters by pair name through the (integration_pair, datetime) index
+    def page(self, limit=PAGE_SIZE, before=None, pair_prefix=None):
+        where, params = [], []
+        if pair_prefix:
+            where.append("integration_pair >= ? AND integration_pair < ?")
+            params += [pair_prefix, pair_prefix + "\U0010ffff"]
+        if before is not None:
+            where.append("(datetime < ? OR (datetime = ? AND id < ?))")
+            params += [before[0], before[0], before[1]]
+        sql = f"SELECT {_COLUMNS} FROM evaluations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql + " ORDER BY datetime DESC, id DESC LIMIT ?", params + [limit])
+
+    def pairs(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT integration_pair FROM evaluations "
+                                      "ORDER BY integration_pair").fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, integration_pair=None):
+        with self._lock:
+            if integration_pair is None:
+                return self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM evaluations WHERE integration_pair = ?",
+                                      (integration_pair,)).fetchone()[0]
+
+    #one-off import of the old session_<pair>.json files next to the
+    #database, run when the store is opened. the records and the meta marker
+    #are written in one transaction, so the files are imported exactly once.
+    #unreadable files are skipped
+    def import_json_sessions(self, folder="sessions"):
+        rows = []
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (_JSON_IMPORTED,)).fetchone():
+                return 0
+            for filename in sorted(glob.glob(os.path.join(folder, "session_*.json"))):
+                try:
+                    with open(filename, encoding="utf-8") as f:
+                        rows += [self._row(record) for record in json.load(f)]
+                except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                    continue
+            self._conn.executemany(_INSERT, rows)
+            self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (_JSON_IMPORTED, str(len(rows))))
+        return len(rows)
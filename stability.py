@@ -0,0 +1,88 @@
+#analytic rank stability of the criterion weights. the final score is linear
+#in the weights, so moving the weight of one criterion j to t (the other
+#weights are rescaled proportionally and the total stays the same) moves
+#every strategy's score along a straight line
+#
+#   F_i(t) = T * R_i + t * (N_ij - R_i),   R_i = (F_i - w_j * N_ij) / (T - w_j)
+#
+#with N the normalized scores and T the weight total. two strategies swap
+#places where their lines cross, which is solved in closed form for all
+#criteria and strategy pairs at once instead of re-evaluating sampled weights
+import numpy as np
+
+from calculations import calculate_final_scores, normalize_data
+from criteria import DEFAULT_CRITERIA
+
+#scores is (pairs x strategies x criteria), weights (criteria,) or (pairs x criteria).
+#returns arrays for every pair p and criterion j:
+#  crossovers[p, j, a, b]   weight of j at which strategies a and b swap, nan if they never do in [0, T]
+#  lower/upper[p, j, i]     weight interval of j in which strategy i keeps its rank
+#  winner_lower/upper[p, j] interval in which the current winner stays best
+#  ranking_lower/upper[p, j] interval in which the whole ranking stays the same
+def stability_batch(scores, weights, directions):
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim != 3:
+        raise ValueError(f"Expected a (pairs x strategies x criteria) array, got shape {scores.shape}")
+    normalized = normalize_data(scores, directions)
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), (scores.shape[0], scores.shape[2]))
+    final_scores = calculate_final_scores(normalized, weights)
+    total = weights.sum(axis=-1)
+
+    #everything below is (pairs x criteria x strategies)
+    column = normalized.transpose(0, 2, 1)
+    w = weights[:, :, None]
+    rest = (total[:, None] - weights)[:, :, None]
+    others = final_scores[:, None, :] - w * column
+    #a criterion that holds all the weight leaves nothing to rescale
+    per_unit = np.divide(others, rest, out=np.zeros_like(others), where=rest > 0)
+    slope = column - per_unit
+
+    #F_a(t) - F_b(t) = T * (R_a - R_b) + t * (slope_a - slope_b)
+    d_slope = slope[..., :, None] - slope[..., None, :]
+    d_offset = total[:, None, None, None] * (per_unit[..., :, None] - per_unit[..., None, :])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossovers = -d_offset / d_slope
+    limit = total[:, None, None, None]
+    crossovers[~np.isfinite(crossovers) | (crossovers < 0) | (crossovers > limit)] = np.nan
+
+    current = w[..., None]
+    below = np.where(crossovers <= current, crossovers, -np.inf)
+    above = np.where(crossovers >= current, crossovers, np.inf)
+    lower = np.maximum(below.max(axis=-1), 0.0)
+    upper = np.minimum(above.min(axis=-1), total[:, None, None])
+
+    winners = np.argmax(final_scores, axis=1)
+    pick = winners[:, None, None]
+    return {
+        "final_scores": final_scores,
+        "winners": winners,
+        "weights": weights,
+        "crossovers": crossovers,
+        "lower": lower,
+        "upper": upper,
+        "winner_lower": np.take_along_axis(lower, pick, axis=-1)[..., 0],
+        "winner_upper": np.take_along_axis(upper, pick, axis=-1)[..., 0],
+        "ranking_lower": lower.max(axis=-1),
+        "ranking_upper": upper.min(axis=-1),
+    }
+
+#single pair version keyed by criterion and strategy name. crossovers lists
+#(weight, strategy a, strategy b) sorted by weight
+def weight_stability(strategies, weights, scores, directions, criteria=DEFAULT_CRITERIA):
+    result = stability_batch(np.asarray(scores, dtype=float)[None], np.asarray(weights, dtype=float)[None],
+                             np.asarray(directions)[None])
+    out = {}
+    for j, criterion in enumerate(criteria):
+        crossovers = result["crossovers"][0, j]
+        points = sorted((float(crossovers[a, b]), strategies[a], strategies[b])
+                        for a in range(len(strategies)) for b in range(a + 1, len(strategies))
+                        if not np.isnan(crossovers[a, b]))
+        out[criterion] = {
+            "weight": float(result["weights"][0, j]),
+            "winner_interval": (float(result["winner_lower"][0, j]), float(result["winner_upper"][0, j])),
+            "ranking_interval": (float(result["ranking_lower"][0, j]), float(result["ranking_upper"][0, j])),
+            "strategy_intervals": {s: (float(result["lower"][0, j, i]), float(result["upper"][0, j, i]))
+                                   for i, s in enumerate(strategies)},
+            "crossovers": points,
+        }
+    return out
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from calculations import evaluate_integration
+from criteria import CATEGORY_TO_WEIGHT, DEFAULT_DIRECTIONS
+from incremental import REFRESH_INTERVAL, IncrementalEvaluator
+
+STRATEGIES = ["Symbiosis", "Absorption", "Preservation", "Transformation"]
+
+#weights normalized to sum to 1.0 the way process_input does
+def _expected(weights, scores, directions):
+    weights = list(weights)
+    total_weight = sum(weights)
+    if abs(total_weight - 1.0) > 0.01:
+        weights = [w / total_weight for w in weights]
+    return evaluate_integration(STRATEGIES, weights, scores, directions)
+
+def _assert_matches(evaluator, directions):
+    expected = _expected(evaluator.weights, evaluator.scores, directions)
+    results = evaluator.results()
+    for strategy in STRATEGIES:
+        assert results[strategy] == pytest.approx(expected[strategy], abs=1e-12, rel=0)
+
+@pytest.mark.parametrize("directions", [DEFAULT_DIRECTIONS, ["max", "min", "x", "max", "min", "max"]])
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_evaluate_integration(seed, directions):
+    rng = np.random.default_rng(seed)
+    levels = list(CATEGORY_TO_WEIGHT.values())
+    weights = rng.choice(levels, size=6)
+    scores = rng.integers(1, 11, size=(4, 6)).astype(float)
+    evaluator = IncrementalEvaluator(STRATEGIES, weights, scores, directions)
+    _assert_matches(evaluator, directions)
+
+    #more edits than REFRESH_INTERVAL, so a periodic refresh happens as well
+    for _ in range(REFRESH_INTERVAL + 50):
+        if rng.random() < 0.3:
+            evaluator.set_weight(rng.integers(6), rng.choice(levels))
+        else:
+            #out of the 1-10 range now and then, which moves the column bounds
+            evaluator.set_score(rng.integers(4), rng.integers(6), rng.uniform(-2, 13))
+        _assert_matches(evaluator, directions)
+
+def test_edit_on_column_bound():
+    scores = [[1, 5, 3, 2, 8, 4], [4, 2, 6, 5, 3, 7], [7, 8, 1, 9, 6, 2], [3, 3, 9, 1, 4, 5]]
+    weights = [0.5, 0.3, 0.1, 0.1, 0.3, 0.5]
+    evaluator = IncrementalEvaluator(STRATEGIES, weights, scores, DEFAULT_DIRECTIONS)
+    #lower the column maximum, raise the minimum, then flatten a column
+    evaluator.set_score(2, 0, 2)
+    _assert_matches(evaluator, DEFAULT_DIRECTIONS)
+    evaluator.set_score(0, 0, 6)
+    _assert_matches(evaluator, DEFAULT_DIRECTIONS)
+    for i in range(4):
+        evaluator.set_score(i, 3, 5)
+        _assert_matches(evaluator, DEFAULT_DIRECTIONS)
+
+def test_set_scores_and_weights():
+    rng = np.random.default_rng(42)
+    evaluator = IncrementalEvaluator(STRATEGIES, [0.1] * 6, rng.random((4, 6)), DEFAULT_DIRECTIONS)
+    evaluator.set_scores(rng.random((4, 6)))
+    evaluator.set_weights([0.5, 0.3, 0.1, 0.5, 0.3, 0.1])
+    _assert_matches(evaluator, DEFAULT_DIRECTIONS)
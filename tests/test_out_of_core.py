@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import calculations
+from calculations import (column_bounds, evaluate_batch, evaluate_integration, evaluate_out_of_core,
+                          normalize_data)
+from criteria import DEFAULT_DIRECTIONS
+
+DIRECTIONS = ["max", "min", "x", "max", "min", "max"]
+
+#small chunks, so every memory-mapped input is processed in many of them
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(calculations, "OUT_OF_CORE_CHUNK_BYTES", 4096)
+
+def _mapped(tmp_path, array):
+    path = tmp_path / "scores.npy"
+    np.save(path, array)
+    mapped = np.load(path, mmap_mode="r")
+    assert isinstance(mapped, np.memmap)
+    return mapped
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("directions", [DEFAULT_DIRECTIONS, DIRECTIONS])
+def test_matrix_matches_in_memory(tmp_path, dtype, directions):
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(1, 10, size=(5000, 6)).astype(dtype)
+    weights = rng.random(6)
+    mapped = _mapped(tmp_path, scores)
+
+    for got, expected in zip(column_bounds(mapped), column_bounds(scores)):
+        np.testing.assert_array_equal(got, expected)
+
+    normalized = normalize_data(mapped, directions)
+    assert isinstance(normalized, np.memmap)
+    np.testing.assert_allclose(normalized, normalize_data(scores, directions), rtol=0, atol=1e-12)
+
+    out = np.empty(scores.shape)
+    assert normalize_data(mapped, directions, out=out) is out
+    np.testing.assert_allclose(out, normalize_data(scores, directions), rtol=0, atol=1e-12)
+
+    strategies = [f"s{i}" for i in range(len(scores))]
+    expected = evaluate_integration(strategies, weights, scores, directions)
+    got = evaluate_integration(strategies, weights, mapped, directions)
+    np.testing.assert_allclose([got[s] for s in strategies], [expected[s] for s in strategies], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(evaluate_out_of_core(mapped, weights, directions),
+                               [expected[s] for s in strategies], rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("per_pair", [False, True])
+def test_stack_matches_in_memory(tmp_path, per_pair):
+    rng = np.random.default_rng(1)
+    scores = rng.uniform(1, 10, size=(700, 4, 6))
+    if per_pair:
+        weights = rng.random((700, 6))
+        directions = rng.choice(["max", "min", "x"], size=(700, 6))
+    else:
+        weights, directions = rng.random(6), DIRECTIONS
+    mapped = _mapped(tmp_path, scores)
+
+    for got, expected in zip(column_bounds(mapped), column_bounds(scores)):
+        np.testing.assert_array_equal(got, expected)
+    np.testing.assert_allclose(normalize_data(mapped, directions), normalize_data(scores, directions),
+                               rtol=0, atol=1e-12)
+
+    final_scores, winners = evaluate_batch(mapped, weights, directions)
+    expected_scores, expected_winners = evaluate_batch(scores, weights, directions)
+    np.testing.assert_allclose(final_scores, expected_scores, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(winners, expected_winners)
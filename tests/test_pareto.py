@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import calculations
+from calculations import direction_codes, evaluate_batch, evaluate_batch_pareto, pareto_front
+from criteria import DEFAULT_DIRECTIONS
+
+DIRECTIONS = ["max", "min", "x", "max", "min", "max"]
+
+#a dominates b: at least as good on every criterion with a direction and
+#better on one of them
+def _dominates(a, b, codes):
+    oriented_a, oriented_b = a[codes != 0] * codes[codes != 0], b[codes != 0] * codes[codes != 0]
+    return bool(np.all(oriented_a >= oriented_b) and np.any(oriented_a > oriented_b))
+
+def _check(scores, directions, dominated_by):
+    codes = direction_codes(directions)
+    n = len(scores)
+    for i in range(n):
+        dominated = any(_dominates(scores[k], scores[i], codes) for k in range(n) if k != i)
+        if not dominated:
+            assert dominated_by[i] == -1
+        else:
+            d = dominated_by[i]
+            assert d >= 0 and dominated_by[d] == -1
+            assert _dominates(scores[d], scores[i], codes)
+
+#few score levels, so ties and duplicate strategies are common
+def _scores(rng, shape, levels=5):
+    return rng.integers(0, levels, size=shape).astype(float)
+
+@pytest.mark.parametrize("n", [1, 2, 4, 30, 64, 65, 300])
+@pytest.mark.parametrize("directions", [DEFAULT_DIRECTIONS, DIRECTIONS])
+def test_matrix_matches_brute_force(n, directions):
+    rng = np.random.default_rng(n)
+    scores = _scores(rng, (n, 6))
+    _check(scores, directions, pareto_front(scores, directions))
+
+def test_blocks_and_slices_match_brute_force(monkeypatch):
+    #small blocks and a larger matrix, so candidates meet the front across
+    #several blocks and slices
+    monkeypatch.setattr(calculations, "PARETO_BLOCK", 32)
+    monkeypatch.setattr(calculations, "PARETO_SLICE", 16)
+    rng = np.random.default_rng(7)
+    scores = np.vstack([_scores(rng, (500, 4), levels=8), rng.uniform(0, 8, size=(300, 4))])
+    _check(scores, ["max", "min", "max", "min"], pareto_front(scores, ["max", "min", "max", "min"]))
+
+@pytest.mark.parametrize("n_strategies", [4, 70])
+def test_stack_matches_brute_force(n_strategies):
+    rng = np.random.default_rng(n_strategies)
+    scores = _scores(rng, (40, n_strategies, 6), levels=3)
+    directions = rng.choice(["max", "min", "x"], size=(40, 6))
+    dominated_by = pareto_front(scores, directions)
+    for k in range(len(scores)):
+        _check(scores[k], directions[k], dominated_by[k])
+
+def test_evaluate_batch_pareto_scores_the_front():
+    rng = np.random.default_rng(3)
+    scores = _scores(rng, (200, 5, 6))
+    weights = rng.random((200, 6))
+    final_scores, winners, dominated_by = evaluate_batch_pareto(scores, weights, DEFAULT_DIRECTIONS)
+    expected_scores, expected_winners = evaluate_batch(scores, weights, DEFAULT_DIRECTIONS)
+    front = dominated_by < 0
+    np.testing.assert_array_equal(front, pareto_front(scores, DEFAULT_DIRECTIONS) < 0)
+    assert np.isnan(final_scores[~front]).all()
+    np.testing.assert_allclose(final_scores[front], expected_scores[front], rtol=0, atol=1e-12)
+    #on ties the winner may differ, but never its score
+    np.testing.assert_allclose(final_scores[np.arange(200), winners], expected_scores[np.arange(200), expected_winners],
+                               rtol=0, atol=1e-12)
+    assert front[np.arange(200), winners].all()
@@ -1,4 +1,24 @@
 import tkinter as tk
+import ttkbootstrap as ttk
+
+#one tooltip window per Tk root, shared by every ToolTip. it is withdrawn
+#between hovers instead of being created and destroyed each time
+_tip_windows = {}
+
+def _tip_window(widget):
+    root = widget._root()
+    tip = _tip_windows.get(root)
+    if tip is None or not tip.winfo_exists():
+        tip = tk.Toplevel(root)
+        tip.withdraw()
+        tip.wm_overrideredirect(True)
+        tip.label = tk.Label(tip, justify="left",
+                             background="#ffffe0", relief="solid", borderwidth=1,
+                             font=("tahoma", "8", "normal"))
+        tip.label.pack(ipadx=1)
+        tip.owner = None
+        _tip_windows[root] = tip
+    return tip
 
 class ToolTip:
     def __init__(self, widget, text):
@@ -9,23 +29,49 @@ class ToolTip:
         self.x = self.y = 0
         self.widget.bind("<Enter>", self.showtip)
         self.widget.bind("<Leave>", self.hidetip)
+        #the shared window outlives the widget, it must not stay on screen
+        self.widget.bind("<Destroy>", self.hidetip, add="+")
 
     def showtip(self, event):
         x, y, _, _ = self.widget.bbox("insert")
         x += self.widget.winfo_rootx() + 25
         y += self.widget.winfo_rooty() + 25
 
-        self.tipwindow = tw = tk.Toplevel(self.widget)
-        tw.wm_overrideredirect(True)
+        self.tipwindow = tw = _tip_window(self.widget)
+        tw.owner = self
+        tw.label.config(text=self.text)
         tw.wm_geometry(f"+{x}+{y}")
-
-        label = tk.Label(tw, text=self.text, justify="left",
-                         background="#ffffe0", relief="solid", borderwidth=1,
-                         font=("tahoma", "8", "normal"))
-        label.pack(ipadx=1)
+        tw.deiconify()
+        tw.lift()
 
     def hidetip(self, event):
         tw = self.tipwindow
         self.tipwindow = None
-        if tw:
-            tw.destroy()
+        #another tooltip may have taken the window over in the meantime
+        if tw and tw.owner is self and tw.winfo_exists():
+            tw.owner = None
+            tw.withdraw()
+
+#one frame per screen under container. a screen is built the first time it
+#is shown and afterwards only hidden, its refresh callback updates the
+#data-bound widgets every time it is shown again
+class ViewManager:
+    def __init__(self, container):
+        self.container = container
+        self.frames = {}
+        self.current = None
+
+    def show(self, name, build, refresh=None):
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self.frames[name] = ttk.Frame(self.container)
+            build(frame)
+        #refreshed before it is packed so old data never flashes up
+        if refresh is not None:
+            refresh()
+        if self.current != name:
+            if self.current is not None:
+                self.frames[self.current].pack_forget()
+            frame.pack(fill="both", expand=True)
+            self.current = name
+        return frame
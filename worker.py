@@ -0,0 +1,176 @@
+#background execution for the GUI. evaluation jobs run on a worker thread,
+#their callbacks (progress, done, error, cancelled) are handed back to the Tk
+#main loop through a queue that is polled with root.after, so widgets are
+#only ever touched from the main thread. disk writes go through a separate
+#write-behind thread that batches them.
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+
+import profiling
+
+POLL_INTERVAL_MS = 50
+#callbacks handled per poll, keeps a burst of progress updates from
+#starving the event loop
+MAX_CALLBACKS_PER_POLL = 100
+MAX_WRITE_BATCH = 256
+
+class Job:
+    def __init__(self, fn, on_done=None, on_error=None, on_progress=None, on_cancel=None, name="job"):
+        self.fn = fn
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.cancel_event = threading.Event()
+        self._worker = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    #called from the job function, forwards progress to the main thread
+    def report(self, done, total):
+        if self.on_progress is not None and not self.cancelled:
+            self._worker.post(self.on_progress, done, total)
+
+class BackgroundWorker:
+    def __init__(self, root, threads=1, poll_ms=POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._callbacks = queue.Queue()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._run, name=f"evaluation-worker-{i}", daemon=True)
+                         for i in range(threads)]
+        for thread in self._threads:
+            thread.start()
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    #fn receives the Job as its only argument and can call job.report() and
+    #check job.cancel_event. callbacks run on the Tk main thread
+    def submit(self, fn, on_done=None, on_error=None, on_progress=None, on_cancel=None, name="job"):
+        job = Job(fn, on_done, on_error, on_progress, on_cancel, name)
+        job._worker = self
+        self._jobs.put(job)
+        return job
+
+    #schedules callback(*args) on the Tk main thread, safe from any thread
+    def post(self, callback, *args):
+        if callback is not None:
+            self._callbacks.put((callback, args))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled:
+                self.post(job.on_cancel)
+                continue
+            try:
+                with profiling.span(f"worker.{job.name}"):
+                    result = job.fn(job)
+            except CancelledError:
+                self.post(job.on_cancel)
+            except Exception as e:
+                self.post(job.on_error, e)
+            else:
+                if job.cancelled:
+                    self.post(job.on_cancel)
+                else:
+                    self.post(job.on_done, result)
+
+    #a failing callback is reported like any other Tk callback error and does
+    #not stop the polling, later jobs still get their results delivered
+    def _poll(self):
+        try:
+            for _ in range(MAX_CALLBACKS_PER_POLL):
+                try:
+                    callback, args = self._callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    callback(*args)
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            if not self._closed:
+                self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def close(self):
+        self._closed = True
+        for _ in self._threads:
+            self._jobs.put(None)
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:
+            pass
+
+#write-behind queue for session records and exported results. everything
+#queued while a batch is being written goes into the next batch: records for
+#the same sink (anything with append_many, e.g. a SessionStore or a
+#ResultExporter) are written in one call
+class WriteBehind:
+    def __init__(self, on_error=None):
+        self.on_error = on_error
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def append(self, sink, record):
+        self._queue.put(("append", sink, record))
+
+    #blocks until everything queued so far is written
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            appends = OrderedDict()
+            flushes = []
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                kind, a, b = item
+                if kind == "append":
+                    appends.setdefault(id(a), (a, []))[1].append(b)
+                else:
+                    flushes.append(a)
+
+            with profiling.span("write_behind.batch", items=len(batch)):
+                for sink, records in appends.values():
+                    self._guard(sink.append_many, records)
+            for done in flushes:
+                done.set()
+            if stop:
+                return
+
+    def _guard(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)